@@ -1,34 +1,31 @@
-import csv
-import matplotlib.pyplot as plt
+import sys
+from pathlib import Path
 
-# ---------------------------------------------------------
-# 1. Función: Leer CSV (reutiliza tu P01 pero más compacta)
-# ---------------------------------------------------------
-def leer_gastos(ruta_csv):
-    gastos = []
+import matplotlib.pyplot as plt
 
-    with open(ruta_csv, "r", encoding="utf-8") as archivo:
-        lector = csv.DictReader(archivo)
+# Carpeta raíz del repo, para poder importar el paquete "comun"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-        for fila in lector:
-            fila["monto"] = int(fila["monto"])
-            gastos.append(fila)
+from comun.dinero import suma_exacta
 
-    return gastos
+# ---------------------------------------------------------
+# 1. Lectura del CSV: la misma de analisis_gastos.py (esquema "gastos")
+# ---------------------------------------------------------
+from analisis_gastos import leer_gastos
 
 
 # ---------------------------------------------------------
 # 2. Función: Calcular métricas principales
 # ---------------------------------------------------------
 def calcular_metricas(gastos):
-    total = sum(g["monto"] for g in gastos)
+    total = suma_exacta(g.monto for g in gastos)
     promedio = total / len(gastos) if gastos else 0
 
     # Agrupar por categoría
     categorias = {}
     for g in gastos:
-        cat = g["categoria"]
-        categorias[cat] = categorias.get(cat, 0) + g["monto"]
+        cat = g.categoria
+        categorias[cat] = categorias.get(cat, 0) + g.monto
 
     # Ranking categorías
     categorias_ordenadas = sorted(categorias.items(), key=lambda x: x[1], reverse=True)
@@ -37,7 +34,7 @@ def calcular_metricas(gastos):
     top3 = categorias_ordenadas[:3]
 
     # Gasto máximo individual
-    gasto_max = max(gastos, key=lambda x: x["monto"])
+    gasto_max = max(gastos, key=lambda x: x.monto)
 
     return total, promedio, categorias, top3, gasto_max
 
@@ -77,7 +74,7 @@ def guardar_reporte(total, promedio, categorias, top3, gasto_max):
             archivo.write(f" - {c}: ${m}\n")
 
         archivo.write("\nGasto individual más alto:\n")
-        archivo.write(f" - {gasto_max['categoria']}: ${gasto_max['monto']} ({gasto_max['detalle']})\n")
+        archivo.write(f" - {gasto_max.categoria}: ${gasto_max.monto} ({gasto_max.detalle})\n")
 
 
 # ---------------------------------------------------------
@@ -1,5 +1,18 @@
-import csv
+import argparse
+import sys
 from collections import defaultdict
+from pathlib import Path
+
+# Carpeta raíz del repo, para poder importar el paquete "comun"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from comun.categorias import crear_normalizador
+from comun.compresion import abrir_texto
+from comun.esquemas import EVENTOS_DJ, leer_registros
+from comun.parciales import cargar_parcial, guardar_parcial
+from comun.validacion import usar_validador
+
+normalizador_categorias = crear_normalizador()
 
 """
 P03 – Analizador de Ingresos DJ (v0.1)
@@ -22,22 +35,79 @@ Más adelante (v0.2+):
 """
 
 
-def leer_eventos(ruta_csv):
-    """Lee el archivo CSV de eventos DJ y devuelve una lista de diccionarios."""
-    eventos = []
+def leer_eventos(
+    ruta_csv, fecha_desde=None, fecha_hasta=None, tipos=None, columnas=None, validador=None
+):
+    """
+    Lee el archivo CSV de eventos DJ y devuelve una lista de EventoDJ
+    (namedtuple del esquema "eventos_dj", ver comun/esquemas.py): fecha
+    como date, horas como int y los montos en pesos enteros exactos.
+
+    Filtros opcionales (se aplican sobre el texto crudo, antes de convertir):
+    - fecha_desde / fecha_hasta: rango de fechas inclusivo (AAAA-MM-DD)
+    - tipos: conjunto de tipo_evento aceptados
+    - columnas: solo se convierten estas columnas; las demás quedan en None
+    - validador: cuenta las filas con números inválidos y las manda a
+      cuarentena (ver comun/validacion.py)
+    """
+    with abrir_texto(ruta_csv) as archivo, usar_validador(validador) as v:
+        eventos = leer_registros(
+            archivo,
+            EVENTOS_DJ,
+            v,
+            origen=str(ruta_csv),
+            columnas=columnas,
+            # El tipo de evento se usa para agrupar: lo normalizamos
+            normalizar=normalizador_categorias.normalizar,
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta,
+            categorias=tipos,
+            col_categoria="tipo_evento",
+        )
+        return list(eventos)
+
+
+# Tipo de los archivos de parcial de este analizador
+TIPO_PARCIAL = "ingresos_dj"
+
+
+def calcular_parcial(eventos):
+    """
+    Paso "map": resume un grupo de eventos (un shard) en un parcial
+    (diccionario de totales) que se puede combinar con otros.
+    """
+    parcial = {"num_eventos": 0, "bruto": 0, "neto": 0, "horas": 0}
+
+    for e in eventos:
+        ingreso_bruto = e.pago_base + e.propina
+        costos = e.transporte + e.otros_costos
+
+        parcial["num_eventos"] += 1
+        parcial["bruto"] += ingreso_bruto
+        parcial["neto"] += ingreso_bruto - costos
+        parcial["horas"] += e.horas
 
-    with open(ruta_csv, "r", encoding="utf-8") as archivo:
-        lector = csv.DictReader(archivo)
-        for fila in lector:
-            # Convertimos los campos numéricos a int
-            fila["horas"] = int(fila["horas"])
-            fila["pago_base"] = int(fila["pago_base"])
-            fila["propina"] = int(fila["propina"])
-            fila["transporte"] = int(fila["transporte"])
-            fila["otros_costos"] = int(fila["otros_costos"])
-            eventos.append(fila)
+    return parcial
 
-    return eventos
+
+def combinar_parciales(parciales):
+    """Paso "merge": suma campo a campo varios parciales."""
+    total = {"num_eventos": 0, "bruto": 0, "neto": 0, "horas": 0}
+    for p in parciales:
+        for campo in total:
+            total[campo] += p[campo]
+    return total
+
+
+def finalizar_metricas(parcial):
+    """Paso "finalize": parcial -> (bruto, neto, valor hora promedio)."""
+    if parcial["num_eventos"] == 0:
+        return 0, 0, 0
+
+    horas_totales = parcial["horas"]
+    valor_hora_promedio = parcial["neto"] / horas_totales if horas_totales > 0 else 0
+
+    return parcial["bruto"], parcial["neto"], valor_hora_promedio
 
 
 def calcular_metricas_basicas(eventos):
@@ -47,32 +117,18 @@ def calcular_metricas_basicas(eventos):
     - ingreso total neto (descontando costos)
     - valor hora promedio
     """
-    if not eventos:
-        return 0, 0, 0
-
-    ingreso_total_bruto = 0
-    ingreso_total_neto = 0
-    horas_totales = 0
-
-    for e in eventos:
-        ingreso_bruto = e["pago_base"] + e["propina"]
-        costos = e["transporte"] + e["otros_costos"]
-        ingreso_neto = ingreso_bruto - costos
-
-        ingreso_total_bruto += ingreso_bruto
-        ingreso_total_neto += ingreso_neto
-        horas_totales += e["horas"]
-
-    valor_hora_promedio = ingreso_total_neto / horas_totales if horas_totales > 0 else 0
+    return finalizar_metricas(calcular_parcial(eventos))
 
-    return ingreso_total_bruto, ingreso_total_neto, valor_hora_promedio
 
-
-def generar_reporte(eventos, ruta_reporte="02_data/reporte_ingresos_dj.txt"):
+def generar_reporte(eventos, ruta_reporte="02_data/reporte_ingresos_dj.txt", metricas=None):
     """
     Genera un archivo de texto con un resumen simple de los ingresos.
+    Si ya se tienen las métricas (por ejemplo desde un parcial), se
+    pueden pasar en `metricas` y `eventos` puede ser None.
     """
-    ingreso_bruto, ingreso_neto, valor_hora = calcular_metricas_basicas(eventos)
+    if metricas is None:
+        metricas = calcular_metricas_basicas(eventos)
+    ingreso_bruto, ingreso_neto, valor_hora = metricas
 
     with open(ruta_reporte, "w", encoding="utf-8") as f:
         f.write("=== REPORTE DE INGRESOS DJ ===\n\n")
@@ -83,11 +139,54 @@ def generar_reporte(eventos, ruta_reporte="02_data/reporte_ingresos_dj.txt"):
     print(f"Reporte generado en: {ruta_reporte}")
 
 
-if __name__ == "__main__":
-    ruta = "02_data/eventos_dj_demo.csv"
-    eventos = leer_eventos(ruta)
+def main():
+    """
+    Sin argumentos: reporte de 02_data/eventos_dj_demo.csv (como siempre).
+
+    Con varias máquinas (cada una con su parte de los eventos):
+        python 02_data/P03_ingresos_dj.py map shard_01.csv shard_01.parcial
+        python 02_data/P03_ingresos_dj.py merge total.parcial shard_01.parcial shard_02.parcial
+        python 02_data/P03_ingresos_dj.py finalize total.parcial
+    """
+    parser = argparse.ArgumentParser(description="Analizador de ingresos DJ")
+    comandos = parser.add_subparsers(dest="comando")
+
+    cmd_map = comandos.add_parser("map", help="CSV de un shard -> parcial")
+    cmd_map.add_argument("csv", type=Path)
+    cmd_map.add_argument("salida", type=Path)
+
+    cmd_merge = comandos.add_parser("merge", help="varios parciales -> un parcial")
+    cmd_merge.add_argument("salida", type=Path)
+    cmd_merge.add_argument("entradas", type=Path, nargs="+")
 
-    if not eventos:
-        print("No se encontraron eventos.")
-    else:
-        generar_reporte(eventos)
+    cmd_finalize = comandos.add_parser("finalize", help="parcial -> reporte")
+    cmd_finalize.add_argument("entrada", type=Path)
+    cmd_finalize.add_argument("--reporte", default="02_data/reporte_ingresos_dj.txt")
+
+    args = parser.parse_args()
+
+    if args.comando is None:
+        ruta = "02_data/eventos_dj_demo.csv"
+        eventos = leer_eventos(ruta)
+
+        if not eventos:
+            print("No se encontraron eventos.")
+        else:
+            generar_reporte(eventos)
+
+    elif args.comando == "map":
+        guardar_parcial(args.salida, TIPO_PARCIAL, calcular_parcial(leer_eventos(args.csv)))
+        print(f"Parcial guardado en: {args.salida}")
+
+    elif args.comando == "merge":
+        parciales = (cargar_parcial(r, TIPO_PARCIAL)[1] for r in args.entradas)
+        guardar_parcial(args.salida, TIPO_PARCIAL, combinar_parciales(parciales))
+        print(f"{len(args.entradas)} parciales combinados en: {args.salida}")
+
+    elif args.comando == "finalize":
+        _, parcial = cargar_parcial(args.entrada, TIPO_PARCIAL)
+        generar_reporte(None, args.reporte, metricas=finalizar_metricas(parcial))
+
+
+if __name__ == "__main__":
+    main()
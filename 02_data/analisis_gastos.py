@@ -14,45 +14,65 @@ La idea es que puedas adaptar este análisis a otros archivos
 (otros meses, otras personas, pequeñas empresas, etc.).
 """
 
-import csv
+import sys
 from collections import defaultdict
+from pathlib import Path
 
+# Carpeta raíz del repo, para poder importar el paquete "comun"
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-def leer_gastos(ruta_csv):
+from comun.categorias import crear_normalizador
+from comun.compresion import abrir_texto
+from comun.dinero import suma_exacta
+from comun.esquemas import GASTOS, EncabezadoInvalido, leer_registros
+from comun.validacion import usar_validador
+
+# Normaliza "Comida", "comida " y "COMIDA" a una sola categoría
+normalizador_categorias = crear_normalizador()
+
+
+def leer_gastos(ruta_csv, categorias=None, columnas=None, validador=None):
     """
-    Lee un archivo CSV y devuelve una lista de diccionarios.
+    Lee un archivo CSV y devuelve una lista de gastos.
 
-    Cada fila del CSV se convierte en algo como:
-    {"categoria": "comida", "monto": 8500, "detalle": "almuerzo"}
+    Cada fila del CSV se convierte en un registro Gasto (namedtuple del
+    esquema "gastos", ver comun/esquemas.py), algo como:
+    Gasto(categoria="comida", monto=8500, detalle="almuerzo")
+
+    Los filtros se aplican sobre el texto crudo de cada fila, antes de
+    convertir nada: las filas descartadas no pagan parsear_monto().
 
     Parámetros:
         ruta_csv (str): ruta del archivo CSV.
+        categorias (set[str] | None): solo estas categorías (opcional).
+        columnas (list[str] | None): solo se convierten estas columnas;
+            las demás quedan en None (opcional).
+        validador (Validador | None): cuenta las filas con monto inválido y
+            las manda a cuarentena. Sin validador se imprime un resumen.
 
     Retorna:
-        list[dict]: lista de gastos.
+        list[Gasto]: lista de gastos.
     """
-    gastos = []
-
-    # Abrimos el archivo en modo lectura
-    with open(ruta_csv, "r", encoding="utf-8") as archivo:
-        # DictReader lee cada fila como un diccionario
-        lector = csv.DictReader(archivo)
-
-        # Validamos columnas obligatorias (indentación correcta)
-        columnas_obligatorias = {"categoria", "monto", "detalle"}
-        if not columnas_obligatorias.issubset(lector.fieldnames):
-            print("❌ Error: el CSV no contiene las columnas necesarias.")
-            print("Columnas requeridas:", columnas_obligatorias)
-            print("Columnas encontradas:", lector.fieldnames)
+    # Abrimos el archivo en modo lectura (acepta .csv, .csv.gz y .csv.zst)
+    with abrir_texto(ruta_csv) as archivo, usar_validador(validador) as v:
+        try:
+            # El esquema valida las columnas, convierte el monto a pesos
+            # enteros (por lotes: un monto inválido no corta la lectura) y
+            # normaliza la categoría
+            gastos = leer_registros(
+                archivo,
+                GASTOS,
+                v,
+                origen=str(ruta_csv),
+                columnas=columnas,
+                normalizar=normalizador_categorias.normalizar,
+                categorias=categorias,
+            )
+        except EncabezadoInvalido as error:
+            print("❌ Error:", error)
             return []
 
-        # Recorremos las filas del CSV
-        for fila in lector:
-            # Convertimos el monto de texto a número entero
-            fila["monto"] = int(fila["monto"])
-            gastos.append(fila)
-
-    return gastos
+        return list(gastos)
 
 
 def total_gastado(gastos):
@@ -60,12 +80,12 @@ def total_gastado(gastos):
     Calcula el total gastado sumando todos los montos.
 
     Parámetros:
-        gastos (list[dict]): lista de gastos.
+        gastos (list[Gasto]): lista de gastos.
 
     Retorna:
-        int: suma de todos los montos.
+        int: suma de todos los montos (exacta, en pesos enteros).
     """
-    return sum(item["monto"] for item in gastos)
+    return suma_exacta(item.monto for item in gastos)
 
 
 def gastos_por_categoria(gastos):
@@ -76,7 +96,7 @@ def gastos_por_categoria(gastos):
         {"comida": 19000, "transporte": 3000, ...}
 
     Parámetros:
-        gastos (list[dict]): lista de gastos.
+        gastos (list[Gasto]): lista de gastos.
 
     Retorna:
         dict[str, int]: diccionario categoría → monto total.
@@ -84,8 +104,8 @@ def gastos_por_categoria(gastos):
     categorias = defaultdict(int)
 
     for item in gastos:
-        categoria = item["categoria"]
-        monto = item["monto"]
+        categoria = item.categoria
+        monto = item.monto
         categorias[categoria] += monto
 
     return categorias
@@ -102,7 +122,7 @@ def promedio_por_categoria(gastos):
     y luego calculamos el promedio de cada lista.
 
     Parámetros:
-        gastos (list[dict]): lista de gastos.
+        gastos (list[Gasto]): lista de gastos.
 
     Retorna:
         dict[str, float]: diccionario categoría → promedio.
@@ -111,8 +131,8 @@ def promedio_por_categoria(gastos):
 
     # Recorremos todos los gastos y agrupamos los montos por categoría
     for item in gastos:
-        categoria = item["categoria"]
-        monto = item["monto"]
+        categoria = item.categoria
+        monto = item.monto
         montos_por_categoria[categoria].append(monto)
 
     # Calculamos el promedio para cada categoría
@@ -134,7 +154,7 @@ def generar_resumen(gastos, ruta_resumen="02_data/resumen_gastos.txt"):
     - Promedio de gasto por categoría.
 
     Parámetros:
-        gastos (list[dict]): lista de gastos.
+        gastos (list[Gasto]): lista de gastos.
         ruta_resumen (str): ruta donde se guardará el archivo de resumen.
     """
     total = total_gastado(gastos)
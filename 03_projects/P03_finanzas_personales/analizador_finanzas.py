@@ -1,9 +1,9 @@
-import csv
-from collections import defaultdict
-from dataclasses import dataclass
-from datetime import datetime
+import argparse
+import sys
+from dataclasses import dataclass, field
+from datetime import date, datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Optional, Set, Union
 
 """
 P03 - Analizador de finanzas personales (versión 2)
@@ -28,6 +28,27 @@ RUTA_BASE = Path(__file__).resolve().parents[2]
 # CSV oficial de este proyecto (en 03_projects)
 RUTA_CSV = RUTA_BASE / "03_projects" / "P03_finanzas_personales" / "gastos_demo2.csv"
 
+# Permite importar el paquete "comun" desde la raíz del repo
+sys.path.insert(0, str(RUTA_BASE))
+
+from comun.categorias import crear_normalizador
+from comun.compresion import abrir_texto
+from comun.dinero import suma_exacta
+from comun.esquemas import MOVIMIENTOS, leer_registros
+from comun.formato import formato_clp
+from comun.frecuentes import Frecuente, TopKAproximado
+from comun.parciales import cargar_parcial, guardar_parcial
+from comun.reglas_presupuesto import (
+    Alerta,
+    MotorReglas,
+    TablaMensual,
+    codificar,
+    columnas_desde_movimientos,
+    combinar_tablas,
+    tabla_desde_columnas,
+)
+from comun.validacion import PresupuestoErroresExcedido, Validador, usar_validador
+
 # TXT de salida con el reporte
 RUTA_REPORTE = (
     RUTA_BASE
@@ -36,17 +57,63 @@ RUTA_REPORTE = (
     / "reporte_gastos_p03.txt"
 )
 
+# Reglas de presupuesto (opcional: si no existe, no se evalúan alertas)
+RUTA_REGLAS = (
+    RUTA_BASE
+    / "03_projects"
+    / "P03_finanzas_personales"
+    / "reglas_presupuesto.json"
+)
+
+# CSV con las filas rechazadas y el motivo (solo se crea si hay errores)
+RUTA_CUARENTENA = (
+    RUTA_BASE
+    / "03_projects"
+    / "P03_finanzas_personales"
+    / "cuarentena_gastos_p03.csv"
+)
+
+# Máximo de filas con errores antes de abortar (None = sin límite)
+MAX_ERRORES = 10_000
+
+# Tipo de los archivos de parcial de este analizador
+TIPO_PARCIAL = "resumen_financiero"
+
+# Contadores de los sketches de "detalle" (memoria fija) y cuántos mostrar
+CAPACIDAD_TOP_DETALLE = 1000
+TOP_DETALLES_REPORTE = 5
+
 
 # ==============================
 # Modelos de datos
 # ==============================
 
+# Registro del esquema "movimientos" (namedtuple, ver comun/esquemas.py):
+#   fecha: datetime, categoria: str, monto: int (pesos enteros), detalle: str
+Movimiento = MOVIMIENTOS.registro
+
+
 @dataclass
-class Movimiento:
-    fecha: datetime
-    categoria: str
-    monto: float
-    detalle: str
+class ParcialResumen:
+    """
+    Estado intermedio de calcular_resumen: se puede guardar en disco,
+    combinar con otros parciales y finalizar en un ResumenFinanciero.
+    """
+    num_movimientos: int = 0
+    fecha_inicio: Optional[datetime] = None
+    fecha_fin: Optional[datetime] = None
+    gasto_por_categoria: Dict[str, int] = field(default_factory=dict)
+    gasto_maximo: Optional[Movimiento] = None
+    # Top-K aproximado de "detalle": por cantidad de movimientos y por monto
+    top_detalle_conteo: TopKAproximado = field(
+        default_factory=lambda: TopKAproximado(CAPACIDAD_TOP_DETALLE)
+    )
+    top_detalle_monto: TopKAproximado = field(
+        default_factory=lambda: TopKAproximado(CAPACIDAD_TOP_DETALLE)
+    )
+    # Total, conteo y máximo por (mes, categoría): lo que necesitan las
+    # reglas de presupuesto para evaluarse después del merge
+    por_mes_categoria: TablaMensual = field(default_factory=dict)
 
 
 @dataclass
@@ -55,95 +122,184 @@ class ResumenFinanciero:
     fecha_fin: datetime
     dias_periodo: int
     num_movimientos: int
-    total_general: float
+    total_general: int
     promedio_diario: float
-    gasto_por_categoria: Dict[str, float]
+    gasto_por_categoria: Dict[str, int]
     categoria_top: str
-    monto_categoria_top: float
+    monto_categoria_top: int
     gasto_maximo: Movimiento
+    detalles_frecuentes: List[Frecuente] = field(default_factory=list)
+    detalles_mayor_gasto: List[Frecuente] = field(default_factory=list)
+    # None si no se evaluaron reglas (no hay archivo de reglas)
+    alertas: Optional[List[Alerta]] = None
 
 
 # ==============================
 # Funciones utilitarias
 # ==============================
 
-def formato_clp(monto: float) -> str:
-    """Formatea un número como CLP: 12345.6 -> $12.346"""
-    return f"${monto:,.0f}".replace(",", ".")
+# Normaliza "Comida", "comida " y "COMIDA" a una sola categoría
+normalizador_categorias = crear_normalizador()
 
 
 # ==============================
 # Lectura y procesamiento de datos
 # ==============================
 
-def leer_movimientos(ruta_csv: Path) -> List[Movimiento]:
+def leer_movimientos(
+    ruta_csv: Path,
+    fecha_desde: Optional[Union[str, date]] = None,
+    fecha_hasta: Optional[Union[str, date]] = None,
+    categorias: Optional[Set[str]] = None,
+    columnas: Optional[List[str]] = None,
+    validador: Optional[Validador] = None,
+) -> List[Movimiento]:
     """
     Lee un CSV con columnas:
         fecha,categoria,monto,detalle
     y devuelve una lista de Movimiento.
-    """
-    columnas_requeridas = {"fecha", "categoria", "monto", "detalle"}
 
+    Filtros opcionales (se evalúan sobre el texto crudo de la fila, antes
+    de fromisoformat/parsear_monto, así que las filas descartadas casi no cuestan):
+    - fecha_desde / fecha_hasta: rango inclusivo
+    - categorias: solo estas categorías (se comparan ya normalizadas)
+    - columnas: solo se convierten estas columnas; las demás quedan en None
+
+    Las filas con fecha o monto inválidos se omiten y se cuentan en
+    `validador` (ver comun/validacion.py). Un monto con decimales (ej:
+    "8500.5") es inválido: CLP no tiene decimales y no se redondea (ver
+    comun/dinero.py). Sin validador, se imprime un único resumen al final
+    si hubo errores.
+    """
     print(f"Leyendo movimientos desde: {ruta_csv}")
 
     if not ruta_csv.exists():
         raise FileNotFoundError(f"No se encontró el archivo CSV: {ruta_csv}")
 
-    movimientos: List[Movimiento] = []
+    # El esquema valida las columnas (EncabezadoInvalido, un ValueError),
+    # convierte fecha y monto por lotes y normaliza la categoría
+    with abrir_texto(ruta_csv) as f, usar_validador(validador) as v:
+        movimientos = leer_registros(
+            f,
+            MOVIMIENTOS,
+            v,
+            origen=ruta_csv.name,
+            columnas=columnas,
+            normalizar=normalizador_categorias.normalizar,
+            fecha_desde=fecha_desde,
+            fecha_hasta=fecha_hasta,
+            categorias=categorias,
+        )
+        return list(movimientos)
+
+
+def calcular_parcial(movimientos: Iterable[Movimiento]) -> ParcialResumen:
+    """
+    Paso "map": resume un grupo de movimientos (un shard) en un parcial
+    que después se puede combinar con otros.
+
+    Los montos se juntan en columnas int64 (ver comun/dinero.py) y los
+    totales por categoría, el gasto máximo y la tabla por (mes, categoría)
+    de las reglas se calculan vectorizados, con control de desborde.
+    """
+    parcial = ParcialResumen()
+    movimientos = list(movimientos)
+    if not movimientos:
+        return parcial
+
+    meses, categorias, montos = columnas_desde_movimientos(movimientos)
+    codigos, nombres = codificar(categorias)
+
+    parcial.num_movimientos = len(movimientos)
+    fechas = [m.fecha for m in movimientos]
+    parcial.fecha_inicio = min(fechas)
+    parcial.fecha_fin = max(fechas)
+
+    # Categorías en orden de aparición (así se resuelven los empates del top)
+    parcial.gasto_por_categoria = dict(
+        zip(nombres, montos.sumar_por_grupo(codigos, len(nombres)))
+    )
+
+    # Igual que max(): ante empate se queda el primero
+    parcial.gasto_maximo = movimientos[montos.posicion_maximo()]
+
+    parcial.por_mes_categoria = tabla_desde_columnas(meses, categorias, montos)
+
+    # Detalles más repetidos y con más gasto, con memoria fija. El sketch
+    # de gasto solo admite pesos positivos: los reembolsos (montos
+    # negativos) cuentan en los totales, pero no aquí
+    for m in movimientos:
+        if m.detalle is not None:
+            parcial.top_detalle_conteo.agregar(m.detalle)
+            if m.monto > 0:
+                parcial.top_detalle_monto.agregar(m.detalle, m.monto)
+
+    return parcial
 
-    with ruta_csv.open(encoding="utf-8") as f:
-        lector = csv.DictReader(f)
 
-        if lector.fieldnames is None or not columnas_requeridas.issubset(
-            set(lector.fieldnames)
+def combinar_parciales(parciales: Iterable[ParcialResumen]) -> ParcialResumen:
+    """
+    Paso "merge": junta varios parciales en uno.
+
+    Para obtener exactamente el mismo resultado que una sola máquina, los
+    parciales deben venir en el orden de los shards (así los empates de
+    máximos y el orden de las categorías se resuelven igual). Los top de
+    "detalle" son exactos mientras los sketches no se llenen; después
+    quedan dentro de su cota de error.
+    """
+    total = ParcialResumen()
+
+    for p in parciales:
+        total.num_movimientos += p.num_movimientos
+
+        if p.fecha_inicio is not None and (
+            total.fecha_inicio is None or p.fecha_inicio < total.fecha_inicio
         ):
-            raise ValueError(
-                f"El CSV debe contener las columnas: {', '.join(columnas_requeridas)}. "
-                f"Columnas encontradas: {lector.fieldnames}"
-            )
+            total.fecha_inicio = p.fecha_inicio
+        if p.fecha_fin is not None and (
+            total.fecha_fin is None or p.fecha_fin > total.fecha_fin
+        ):
+            total.fecha_fin = p.fecha_fin
 
-        for fila in lector:
-            try:
-                fecha = datetime.fromisoformat(fila["fecha"])
-            except ValueError:
-                print(f"⚠️  Fecha inválida: {fila['fecha']} (se omite fila)")
-                continue
-
-            try:
-                monto = float(fila["monto"])
-            except ValueError:
-                print(f"⚠️  Monto inválido: {fila['monto']} (se omite fila)")
-                continue
-
-            mov = Movimiento(
-                fecha=fecha,
-                categoria=fila["categoria"],
-                monto=monto,
-                detalle=fila["detalle"],
+        for categoria, monto in p.gasto_por_categoria.items():
+            total.gasto_por_categoria[categoria] = (
+                total.gasto_por_categoria.get(categoria, 0) + monto
             )
-            movimientos.append(mov)
 
-    return movimientos
+        if p.gasto_maximo is not None and (
+            total.gasto_maximo is None or p.gasto_maximo.monto > total.gasto_maximo.monto
+        ):
+            total.gasto_maximo = p.gasto_maximo
 
+        total.top_detalle_conteo = total.top_detalle_conteo.combinar(p.top_detalle_conteo)
+        total.top_detalle_monto = total.top_detalle_monto.combinar(p.top_detalle_monto)
+        total.por_mes_categoria = combinar_tablas(
+            [total.por_mes_categoria, p.por_mes_categoria]
+        )
 
-def calcular_resumen(movimientos: List[Movimiento]) -> ResumenFinanciero:
-    """Calcula todos los KPIs financieros a partir de la lista de movimientos."""
-    if not movimientos:
+    return total
+
+
+def finalizar_resumen(
+    parcial: ParcialResumen, motor: Optional[MotorReglas] = None
+) -> ResumenFinanciero:
+    """
+    Paso "finalize": convierte un parcial en el ResumenFinanciero final.
+    Si se entrega `motor`, las reglas de presupuesto se evalúan sobre la
+    tabla por (mes, categoría) del parcial: da lo mismo en una máquina
+    que después de un merge.
+    """
+    if parcial.num_movimientos == 0:
         raise ValueError("No hay movimientos para analizar.")
 
     # Fechas del periodo
-    fechas = [m.fecha for m in movimientos]
-    fecha_inicio = min(fechas)
-    fecha_fin = max(fechas)
+    fecha_inicio = parcial.fecha_inicio
+    fecha_fin = parcial.fecha_fin
     dias_periodo = (fecha_fin - fecha_inicio).days + 1
 
-    # Gasto por categoría
-    gasto_por_categoria: Dict[str, float] = defaultdict(float)
-    for m in movimientos:
-        gasto_por_categoria[m.categoria] += m.monto
-
-    # Total general y promedio diario
-    total_general = sum(gasto_por_categoria.values())
+    # Total general (exacto, con control de desborde) y promedio diario
+    gasto_por_categoria = parcial.gasto_por_categoria
+    total_general = suma_exacta(gasto_por_categoria.values())
     promedio_diario = total_general / dias_periodo
 
     # Categoría con mayor gasto
@@ -151,20 +307,80 @@ def calcular_resumen(movimientos: List[Movimiento]) -> ResumenFinanciero:
         gasto_por_categoria.items(), key=lambda kv: kv[1]
     )
 
-    # Gasto individual más alto
-    gasto_maximo = max(movimientos, key=lambda m: m.monto)
-
     return ResumenFinanciero(
         fecha_inicio=fecha_inicio,
         fecha_fin=fecha_fin,
         dias_periodo=dias_periodo,
-        num_movimientos=len(movimientos),
+        num_movimientos=parcial.num_movimientos,
         total_general=total_general,
         promedio_diario=promedio_diario,
         gasto_por_categoria=dict(gasto_por_categoria),
         categoria_top=categoria_top,
         monto_categoria_top=monto_categoria_top,
-        gasto_maximo=gasto_maximo,
+        gasto_maximo=parcial.gasto_maximo,
+        detalles_frecuentes=parcial.top_detalle_conteo.top(TOP_DETALLES_REPORTE),
+        detalles_mayor_gasto=parcial.top_detalle_monto.top(TOP_DETALLES_REPORTE),
+        alertas=None if motor is None else motor.evaluar_tabla(parcial.por_mes_categoria),
+    )
+
+
+def calcular_resumen(
+    movimientos: List[Movimiento], motor: Optional[MotorReglas] = None
+) -> ResumenFinanciero:
+    """Calcula todos los KPIs financieros a partir de la lista de movimientos."""
+    return finalizar_resumen(calcular_parcial(movimientos), motor)
+
+
+def cargar_motor_reglas() -> Optional[MotorReglas]:
+    """Reglas de presupuesto compiladas, o None si no hay archivo de reglas."""
+    if not RUTA_REGLAS.exists():
+        return None
+    return MotorReglas.desde_archivo(RUTA_REGLAS, normalizador_categorias.normalizar)
+
+
+# ==============================
+# Parciales en disco (varias máquinas)
+# ==============================
+
+def guardar_parcial_resumen(parcial: ParcialResumen, ruta: Path) -> None:
+    m = parcial.gasto_maximo
+    guardar_parcial(
+        ruta,
+        TIPO_PARCIAL,
+        {
+            "num_movimientos": parcial.num_movimientos,
+            "fecha_inicio": parcial.fecha_inicio,
+            "fecha_fin": parcial.fecha_fin,
+            "gasto_por_categoria": parcial.gasto_por_categoria,
+            "gasto_maximo": (
+                None if m is None else [m.fecha, m.categoria, m.monto, m.detalle]
+            ),
+            "top_detalle_conteo": parcial.top_detalle_conteo.a_dict(),
+            "top_detalle_monto": parcial.top_detalle_monto.a_dict(),
+            # Filas [mes, categoria, total, conteo, maximo]
+            "por_mes_categoria": [
+                [mes, categoria, *celda]
+                for (mes, categoria), celda in parcial.por_mes_categoria.items()
+            ],
+        },
+    )
+
+
+def cargar_parcial_resumen(ruta: Path) -> ParcialResumen:
+    _, datos = cargar_parcial(ruta, TIPO_PARCIAL)
+    maximo = datos["gasto_maximo"]
+    return ParcialResumen(
+        num_movimientos=datos["num_movimientos"],
+        fecha_inicio=datos["fecha_inicio"],
+        fecha_fin=datos["fecha_fin"],
+        gasto_por_categoria=datos["gasto_por_categoria"],
+        gasto_maximo=None if maximo is None else Movimiento(*maximo),
+        top_detalle_conteo=TopKAproximado.desde_dict(datos["top_detalle_conteo"]),
+        top_detalle_monto=TopKAproximado.desde_dict(datos["top_detalle_monto"]),
+        por_mes_categoria={
+            (mes, categoria): celda
+            for mes, categoria, *celda in datos["por_mes_categoria"]
+        },
     )
 
 
@@ -214,6 +430,30 @@ def generar_texto_reporte(resumen: ResumenFinanciero) -> str:
         f"({resumen.gasto_maximo.detalle})"
     )
 
+    # Top-K aproximado: "±" es la cota de error de cada estimado
+    if resumen.detalles_frecuentes:
+        lineas.append("")
+        lineas.append("Detalles más frecuentes:")
+        for f in resumen.detalles_frecuentes:
+            lineas.append(f"  - {f.clave:<20} {f.estimado:>6} veces (±{f.error})")
+
+    if resumen.detalles_mayor_gasto:
+        lineas.append("")
+        lineas.append("Detalles con mayor gasto:")
+        for f in resumen.detalles_mayor_gasto:
+            lineas.append(
+                f"  - {f.clave:<20} {formato_clp(f.estimado):>12} (±{formato_clp(f.error)})"
+            )
+
+    if resumen.alertas is not None:
+        lineas.append("")
+        lineas.append("Alertas de presupuesto:")
+        if resumen.alertas:
+            for alerta in resumen.alertas:
+                lineas.append(f"  - {alerta.texto()}")
+        else:
+            lineas.append("  - Sin alertas: todo dentro del presupuesto.")
+
     lineas.append("=" * 60)
 
     return "\n".join(lineas)
@@ -229,9 +469,33 @@ def guardar_reporte(texto: str, ruta: Path) -> None:
 # Punto de entrada
 # ==============================
 
-def main() -> None:
-    movimientos = leer_movimientos(RUTA_CSV)
-    resumen = calcular_resumen(movimientos)
+def leer_con_presupuesto(ruta_csv: Path, ruta_cuarentena: Path) -> List[Movimiento]:
+    """
+    Lee los movimientos con cuarentena y presupuesto de errores
+    (MAX_ERRORES) y muestra el resumen de la validación.
+
+    Si se supera el presupuesto no se sigue con datos incompletos: se
+    muestra el resumen (con la ruta de la cuarentena) y el programa
+    termina con código 1.
+    """
+    try:
+        with Validador(ruta_cuarentena, max_errores=MAX_ERRORES) as validador:
+            movimientos = leer_movimientos(ruta_csv, validador=validador)
+    except PresupuestoErroresExcedido as error:
+        print(f"❌ {error}")
+        print(validador.resumen())
+        sys.exit(1)
+
+    print(validador.resumen())
+    return movimientos
+
+
+def analisis_completo() -> None:
+    movimientos = leer_con_presupuesto(RUTA_CSV, RUTA_CUARENTENA)
+
+    # Reglas de presupuesto: se compilan una vez y se evalúan todas juntas
+    resumen = calcular_resumen(movimientos, cargar_motor_reglas())
+
     texto_reporte = generar_texto_reporte(resumen)
 
     # Mostrar en consola
@@ -243,5 +507,60 @@ def main() -> None:
     print(f"\nReporte guardado en: {RUTA_REPORTE.resolve()}")
 
 
+def main() -> None:
+    """
+    Sin argumentos: análisis completo de RUTA_CSV (como siempre).
+
+    Con varias máquinas (cada una con su parte del año):
+        python analizador_finanzas.py map shard_01.csv shard_01.parcial
+        python analizador_finanzas.py merge total.parcial shard_01.parcial shard_02.parcial
+        python analizador_finanzas.py finalize total.parcial --reporte reporte.txt
+
+    En "map" las filas rechazadas quedan junto al parcial, en
+    <salida>.cuarentena.csv (ej: shard_01.cuarentena.csv).
+    """
+    parser = argparse.ArgumentParser(description="Analizador de finanzas personales (P03)")
+    comandos = parser.add_subparsers(dest="comando")
+
+    cmd_map = comandos.add_parser("map", help="CSV de un shard -> parcial")
+    cmd_map.add_argument("csv", type=Path)
+    cmd_map.add_argument("salida", type=Path)
+
+    cmd_merge = comandos.add_parser("merge", help="varios parciales -> un parcial")
+    cmd_merge.add_argument("salida", type=Path)
+    cmd_merge.add_argument("entradas", type=Path, nargs="+")
+
+    cmd_finalize = comandos.add_parser("finalize", help="parcial -> reporte")
+    cmd_finalize.add_argument("entrada", type=Path)
+    cmd_finalize.add_argument("--reporte", type=Path, default=None)
+
+    args = parser.parse_args()
+
+    if args.comando is None:
+        analisis_completo()
+
+    elif args.comando == "map":
+        movimientos = leer_con_presupuesto(
+            args.csv, args.salida.with_suffix(".cuarentena.csv")
+        )
+        guardar_parcial_resumen(calcular_parcial(movimientos), args.salida)
+        print(f"Parcial guardado en: {args.salida}")
+
+    elif args.comando == "merge":
+        parcial = combinar_parciales(cargar_parcial_resumen(r) for r in args.entradas)
+        guardar_parcial_resumen(parcial, args.salida)
+        print(f"{len(args.entradas)} parciales combinados en: {args.salida}")
+
+    elif args.comando == "finalize":
+        resumen = finalizar_resumen(
+            cargar_parcial_resumen(args.entrada), cargar_motor_reglas()
+        )
+        texto_reporte = generar_texto_reporte(resumen)
+        print(texto_reporte)
+        if args.reporte is not None:
+            guardar_reporte(texto_reporte, args.reporte)
+            print(f"\nReporte guardado en: {args.reporte.resolve()}")
+
+
 if __name__ == "__main__":
     main()
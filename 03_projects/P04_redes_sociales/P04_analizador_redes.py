@@ -1,5 +1,8 @@
+import sys
 import pandas as pd
 from pathlib import Path
+from functools import lru_cache
+from typing import Dict, List, Optional, Set
 
 """
 P04 - Analizador de redes sociales para artistas/DJs (versión 2)
@@ -25,30 +28,125 @@ BASE_DIR = Path(__file__).resolve().parent
 RUTA_CSV = BASE_DIR / "posts_demo.csv"
 RUTA_REPORTE = BASE_DIR / "reporte_redes.txt"
 
+# Carpeta raíz del repo, para poder importar el paquete "comun"
+sys.path.insert(0, str(BASE_DIR.parents[1]))
+
+from comun.categorias import crear_normalizador
+from comun.compresion import abrir_texto
+from comun.esquemas import POSTS
+from comun.expresiones import ExpresionMetrica
+from comun.frecuentes import Frecuente, TopKAproximado
+
+normalizador_categorias = crear_normalizador()
+
+# Métricas por post, definidas como expresiones sobre las columnas.
+# Se pueden agregar otras; cualquiera sirve para los promedios por red /
+# tipo y para elegir el post top (ver calcular_metricas_engagement).
+# Si el divisor es 0 el resultado es 0.
+METRICAS = {
+    "engagement": "likes + comentarios + guardados",
+    "tasa_engagement": "(likes + 2*comentarios + 3*guardados) / reproducciones",
+}
+
+
+# Contadores del sketch de temas (memoria fija) y cuántos temas mostrar
+CAPACIDAD_TEMAS = 1000
+TOP_TEMAS = 3
+
+
+@lru_cache(maxsize=None)
+def compilar_metrica(expresion: str) -> ExpresionMetrica:
+    """Parsea cada expresión una sola vez por ejecución."""
+    return ExpresionMetrica(expresion)
+
 
 # -------------------------------------------------------------------
 # 2. Carga y preparación de datos
 # -------------------------------------------------------------------
 
-def cargar_datos(ruta_csv: Path) -> pd.DataFrame:
+def cargar_datos(
+    ruta_csv: Path,
+    fecha_desde: Optional[str] = None,
+    fecha_hasta: Optional[str] = None,
+    redes: Optional[Set[str]] = None,
+    tipos: Optional[Set[str]] = None,
+    columnas: Optional[List[str]] = None,
+    metricas: Optional[Dict[str, str]] = None,
+) -> pd.DataFrame:
     """
     Carga el CSV de publicaciones en un DataFrame de pandas y
     asegura que las columnas numéricas sean numéricas.
+
+    Filtros opcionales:
+    - fecha_desde / fecha_hasta: rango inclusivo (AAAA-MM-DD)
+    - redes / tipos: solo estas redes o tipos de contenido
+    - columnas: solo se leen estas columnas (usecols), más las que
+      necesiten los filtros
+    - metricas: nombre -> expresión de las métricas a calcular
+      (por defecto METRICAS). Una métrica cuyas columnas no estén
+      cargadas simplemente no se calcula.
+
+    Todo se lee primero como texto: los filtros se aplican sobre el texto
+    y la conversión numérica se hace solo en las filas que quedan.
     """
     if not ruta_csv.exists():
         raise FileNotFoundError(f"No encontré el archivo: {ruta_csv}")
 
-    df = pd.read_csv(ruta_csv)
+    # Columnas que hay que leer: las pedidas + las que usan los filtros
+    usecols = None
+    if columnas is not None:
+        extra = []
+        if fecha_desde is not None or fecha_hasta is not None:
+            extra.append("fecha")
+        if redes is not None:
+            extra.append("red")
+        if tipos is not None:
+            extra.append("tipo")
+        usecols = list(dict.fromkeys(list(columnas) + extra))
+
+    # abrir_texto acepta también .csv.gz / .csv.zst (detectados por contenido)
+    with abrir_texto(ruta_csv) as f:
+        df = pd.read_csv(f, usecols=usecols, dtype=str)
+
+    # Columnas obligatorias según el esquema "posts" (comun/esquemas.py)
+    if usecols is None:
+        POSTS.verificar_encabezado(df.columns)
+
+    # Normalizamos las categorías del esquema (red y tipo): se limpia cada
+    # valor distinto una sola vez y luego se reemplaza en bloque
+    for col in POSTS.columnas_de_tipo("categoria"):
+        if col in df.columns:
+            unicos = df[col].dropna().unique()
+            mapa = {v: normalizador_categorias.normalizar(str(v)) for v in unicos}
+            df[col] = df[col].map(mapa)
+
+    # Filtros sobre el texto (fechas ISO se comparan como texto)
+    mascara = pd.Series(True, index=df.index)
+    if fecha_desde is not None:
+        mascara &= df["fecha"].str[:10] >= str(fecha_desde)[:10]
+    if fecha_hasta is not None:
+        mascara &= df["fecha"].str[:10] <= str(fecha_hasta)[:10]
+    if redes is not None:
+        mascara &= df["red"].isin({normalizador_categorias.normalizar(r) for r in redes})
+    if tipos is not None:
+        mascara &= df["tipo"].isin({normalizador_categorias.normalizar(t) for t in tipos})
+    if not mascara.all():
+        df = df[mascara].reset_index(drop=True)
+
+    if columnas is not None:
+        df = df[list(columnas)]
 
     # Aseguramos que columnas numéricas sean numéricas
-    cols_numericas = ["likes", "comentarios", "guardados", "reproducciones"]
-    for col in cols_numericas:
+    for col in POSTS.columnas_de_tipo("entero"):
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0)
 
-    # Creamos una columna de engagement simple:
-    # likes + comentarios + guardados
-    df["engagement"] = df["likes"] + df["comentarios"] + df["guardados"]
+    # Creamos una columna por cada métrica (ej: engagement simple =
+    # likes + comentarios + guardados), evaluada sobre columnas completas
+    for nombre, expresion in (METRICAS if metricas is None else metricas).items():
+        metrica = compilar_metrica(expresion)
+        if set(metrica.columnas).issubset(df.columns):
+            df[nombre] = metrica.evaluar(df)
 
     return df
 
@@ -74,28 +172,57 @@ def mostrar_resumen_basico(df: pd.DataFrame) -> None:
     print(df["tipo"].value_counts())
 
 
-def calcular_metricas_engagement(df: pd.DataFrame) -> dict:
+def temas_recurrentes(
+    df: pd.DataFrame,
+    metrica: str = "engagement",
+    n: int = TOP_TEMAS,
+    capacidad: int = CAPACIDAD_TEMAS,
+) -> List[Frecuente]:
+    """
+    Descripciones que más `metrica` acumulan sumando todos sus posts
+    (ej: un mismo tema publicado varias veces).
+
+    Usa un top-K aproximado con memoria fija (comun/frecuentes.py), así
+    funciona aunque haya millones de descripciones distintas. Las
+    descripciones se comparan sin mayúsculas ni espacios repetidos.
+    """
+    # El sketch solo admite pesos positivos (una métrica definida por el
+    # usuario puede dar negativos): esos posts no suman a ningún tema
+    positivos = df[metrica] > 0
+    descripciones = df.loc[positivos, "descripcion"].fillna("")
+    temas = descripciones.str.casefold().str.split().str.join(" ")
+    sketch = TopKAproximado(capacidad)
+    sketch.agregar_muchos(temas, df.loc[positivos, metrica])
+    return sketch.top(n)
+
+
+def calcular_metricas_engagement(df: pd.DataFrame, metrica: str = "engagement") -> dict:
     """
     Calcula métricas de engagement y las devuelve en un diccionario.
+
+    `metrica` es la columna que se usa (cualquiera de METRICAS, por
+    ejemplo "tasa_engagement").
     """
     total_posts = len(df)
-    engagement_promedio = df["engagement"].mean()
+    engagement_promedio = df[metrica].mean()
 
     # Engagement promedio por red
-    eng_por_red = df.groupby("red")["engagement"].mean().sort_values(ascending=False)
+    eng_por_red = df.groupby("red")[metrica].mean().sort_values(ascending=False)
 
     # Engagement promedio por tipo de contenido
-    eng_por_tipo = df.groupby("tipo")["engagement"].mean().sort_values(ascending=False)
+    eng_por_tipo = df.groupby("tipo")[metrica].mean().sort_values(ascending=False)
 
     # Post con mayor engagement
-    post_top = df.sort_values("engagement", ascending=False).iloc[0]
+    post_top = df.sort_values(metrica, ascending=False).iloc[0]
 
     return {
+        "metrica": metrica,
         "total_posts": total_posts,
         "engagement_promedio": engagement_promedio,
         "eng_por_red": eng_por_red,
         "eng_por_tipo": eng_por_tipo,
         "post_top": post_top,
+        "temas_top": temas_recurrentes(df, metrica),
     }
 
 
@@ -122,9 +249,13 @@ def mostrar_metricas_engagement(metricas: dict) -> None:
         f"Descripción: {post_top['descripcion']}\n"
         f"Likes: {post_top['likes']}, Comentarios: {post_top['comentarios']}, "
         f"Guardados: {post_top['guardados']}\n"
-        f"Engagement total: {post_top['engagement']}"
+        f"{metricas['metrica'].capitalize()} total: {post_top[metricas['metrica']]}"
     )
 
+    print(f"\n--- Temas con más {metricas['metrica']} acumulado ---")
+    for tema in metricas["temas_top"]:
+        print(f"{tema.clave}: {tema.estimado} (±{tema.error})")
+
 
 # -------------------------------------------------------------------
 # 4. Generación de reporte en texto
@@ -169,8 +300,14 @@ def generar_reporte_texto(df: pd.DataFrame, metricas: dict) -> str:
         f"- Descripción: {post_top['descripcion']}\n"
         f"- Likes: {post_top['likes']}, Comentarios: {post_top['comentarios']}, "
         f"Guardados: {post_top['guardados']}\n"
-        f"- Engagement total: {post_top['engagement']}"
+        f"- {metricas['metrica'].capitalize()} total: {post_top[metricas['metrica']]}"
     )
+    lineas.append("")
+
+    # Top-K aproximado: "±" es la cota de error de cada estimado
+    lineas.append(f"Temas con más {metricas['metrica']} acumulado:")
+    for tema in metricas["temas_top"]:
+        lineas.append(f"- {tema.clave}: {tema.estimado} (±{tema.error})")
 
     return "\n".join(lineas)
 
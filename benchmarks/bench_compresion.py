@@ -0,0 +1,94 @@
+import argparse
+import csv
+import gzip
+import io
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+"""
+benchmarks/bench_compresion.py - CSV comprimido vs CSV ya descomprimido
+
+Genera un CSV de movimientos, lo comprime (gzip y, si está instalado,
+zstd) y compara el throughput de leer_movimientos sobre:
+- el CSV plano (ya descomprimido a disco)
+- el .csv.gz con gzip.open en el mismo hilo (sin segundo plano)
+- el .csv.gz / .csv.zst con comun.compresion (hilo en segundo plano)
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_compresion.py --filas 500000
+"""
+
+RUTA_BASE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RUTA_BASE))
+sys.path.insert(0, str(RUTA_BASE / "03_projects" / "P03_finanzas_personales"))
+
+import analizador_finanzas  # noqa: E402
+from analizador_finanzas import leer_movimientos  # noqa: E402
+from comun import compresion  # noqa: E402
+
+
+def generar_csv(ruta: Path, filas: int) -> None:
+    with ruta.open("w", encoding="utf-8", newline="") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(["fecha", "categoria", "monto", "detalle"])
+        for i in range(filas):
+            escritor.writerow(
+                [f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}", "comida", 1000 + i % 5000, "detalle demo"]
+            )
+
+
+def medir(nombre: str, ruta: Path, bytes_csv: int, funcion=leer_movimientos) -> None:
+    inicio = time.perf_counter()
+    movimientos = funcion(ruta)
+    segundos = time.perf_counter() - inicio
+    print(
+        f"  {nombre:<34} {segundos:7.3f} s  "
+        f"{bytes_csv / segundos / 1e6:7.1f} MB/s  {len(movimientos) / segundos:10.0f} filas/s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filas", type=int, default=500_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        plano = Path(carpeta) / "movimientos.csv"
+        generar_csv(plano, args.filas)
+        bytes_csv = plano.stat().st_size
+
+        comprimido_gz = Path(carpeta) / "movimientos.csv.gz"
+        with plano.open("rb") as origen, gzip.open(comprimido_gz, "wb") as destino:
+            shutil.copyfileobj(origen, destino)
+
+        print(f"CSV: {args.filas} filas, {bytes_csv / 1e6:.1f} MB "
+              f"(gzip: {comprimido_gz.stat().st_size / 1e6:.1f} MB)\n")
+
+        medir("CSV plano (pre-descomprimido)", plano, bytes_csv)
+
+        # gzip en el mismo hilo: reemplazamos abrir_texto solo para esta medición
+        original = analizador_finanzas.abrir_texto
+        analizador_finanzas.abrir_texto = lambda ruta: io.TextIOWrapper(
+            gzip.open(ruta, "rb"), encoding="utf-8", newline=""
+        )
+        try:
+            medir("gzip en el mismo hilo", comprimido_gz, bytes_csv)
+        finally:
+            analizador_finanzas.abrir_texto = original
+
+        medir("gzip en segundo plano", comprimido_gz, bytes_csv)
+
+        if compresion.zstandard is not None:
+            comprimido_zst = Path(carpeta) / "movimientos.csv.zst"
+            with plano.open("rb") as origen, comprimido_zst.open("wb") as destino:
+                compresion.zstandard.ZstdCompressor().copy_stream(origen, destino)
+            medir("zstd en segundo plano", comprimido_zst, bytes_csv)
+        else:
+            print("  (zstandard no está instalado: se omite zstd)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import argparse
+import random
+import sys
+import time
+from decimal import Decimal
+from pathlib import Path
+
+"""
+benchmarks/bench_dinero.py - Montos en float vs enteros (comun/dinero.py)
+
+1. Verificación de deriva: suma montos con decimales (ej: USD con
+   centavos) como float, como Decimal y como unidades menores enteras.
+   La suma entera tiene que ser IDÉNTICA a la de Decimal; si no, el
+   script termina con error. El float se muestra para comparar.
+2. Tiempo y memoria: parsear + sumar N montos como float en una lista
+   vs como enteros en una ColumnaDinero (numpy int64), y solo la suma:
+   sum() de floats vs suma vectorizada con control de desborde.
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_dinero.py --filas 1000000
+"""
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from comun.dinero import ColumnaDinero, a_decimal, parsear_monto, suma_exacta  # noqa: E402
+
+
+def generar_textos(filas: int, decimales: int):
+    rnd = random.Random(42)
+    if decimales == 0:
+        return [str(rnd.randint(500, 80_000)) for _ in range(filas)]
+    return [f"{rnd.randint(0, 99_999)}.{rnd.randint(0, 99):02d}" for _ in range(filas)]
+
+
+def verificar_sin_deriva(textos, decimales: int) -> None:
+    suma_float = sum(float(t) for t in textos)
+    suma_decimal = sum(Decimal(t) for t in textos)
+    suma_entera = suma_exacta(parsear_monto(t, decimales) for t in textos)
+
+    print("Verificación de deriva:")
+    print(f"  Decimal (referencia): {suma_decimal}")
+    print(f"  enteros (dinero.py):  {a_decimal(suma_entera, decimales)}")
+    print(f"  float:                {suma_float!r}"
+          f"  (diferencia: {Decimal(suma_float) - suma_decimal:.2E})")
+
+    if a_decimal(suma_entera, decimales) != suma_decimal:
+        raise SystemExit("❌ La suma en enteros no coincide con Decimal.")
+    print("  ✅ enteros == Decimal, sin deriva\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filas", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    verificar_sin_deriva(generar_textos(args.filas, 2), decimales=2)
+
+    textos = generar_textos(args.filas, 0)
+    print(f"Montos CLP: {args.filas}")
+
+    inicio = time.perf_counter()
+    montos_float = [float(t) for t in textos]
+    total_float = sum(montos_float)
+    t_float = time.perf_counter() - inicio
+    bytes_float = sys.getsizeof(montos_float) + len(montos_float) * sys.getsizeof(0.0)
+
+    inicio = time.perf_counter()
+    columna = ColumnaDinero.desde_textos(textos)
+    total_entero = columna.suma()
+    t_entero = time.perf_counter() - inicio
+    bytes_entero = columna.valores.nbytes
+
+    print(f"  {'':<24} {'tiempo (s)':>10} {'memoria (MB)':>13} {'total':>16}")
+    print(f"  {'float en lista':<24} {t_float:10.3f} {bytes_float / 1e6:13.1f} {total_float:16.1f}")
+    print(f"  {'int64 en ColumnaDinero':<24} {t_entero:10.3f} {bytes_entero / 1e6:13.1f} {total_entero:16d}")
+
+    inicio = time.perf_counter()
+    for _ in range(10):
+        sum(montos_float)
+    t_suma_float = (time.perf_counter() - inicio) / 10
+    inicio = time.perf_counter()
+    for _ in range(10):
+        columna.suma()
+    t_suma_entero = (time.perf_counter() - inicio) / 10
+    print(f"\n  Solo la suma: float {t_suma_float * 1e3:.1f} ms, int64 {t_suma_entero * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import argparse
+import csv
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+"""
+benchmarks/bench_esquemas.py - Lectores con dict por fila vs conversores generados
+
+Para cada esquema de comun/esquemas.py (gastos, movimientos, eventos_dj,
+posts) genera un CSV y mide filas/segundo de tres formas de leerlo,
+todas con la misma conversión de tipos y normalización de categorías:
+- DictReader: un dict por fila y conversión campo a campo (como leían
+  los scripts originalmente)
+- dict por fila: csv.reader + validar_filas + un dict armado por fila
+  (como leían leer_gastos/leer_eventos antes del registro de esquemas)
+- esquema: leer_registros con el conversor generado (namedtuple por fila)
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_esquemas.py --filas 300000
+"""
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from comun.categorias import crear_normalizador  # noqa: E402
+from comun.esquemas import ESQUEMAS, CONVERSION_POR_TIPO, leer_registros  # noqa: E402
+from comun.validacion import Validador, validar_filas  # noqa: E402
+
+CATEGORIAS = ["Comida", "transporte ", "SERVICIOS", "entretenimiento", "otros"]
+REDES = ["instagram", "TikTok", "youtube"]
+
+
+def generar_fila(esquema: str, rnd: random.Random, fecha: str) -> list:
+    if esquema == "gastos":
+        return [rnd.choice(CATEGORIAS), rnd.randint(500, 80_000), "detalle demo"]
+    if esquema == "movimientos":
+        return [fecha, rnd.choice(CATEGORIAS), rnd.randint(500, 80_000), "detalle demo"]
+    if esquema == "eventos_dj":
+        return [
+            fecha, "Bar Central", rnd.choice(["bar", "Matrimonio", "club"]),
+            rnd.randint(2, 8), rnd.randint(40_000, 200_000), rnd.randint(0, 20_000),
+            rnd.randint(0, 10_000), rnd.randint(0, 5_000),
+        ]
+    return [
+        fecha, rnd.choice(REDES), rnd.choice(["reel", "post", "video"]), "set en Club X",
+        rnd.randint(0, 500), rnd.randint(0, 50), rnd.randint(0, 40), rnd.randint(0, 5000),
+    ]
+
+
+def generar_csv(ruta: Path, nombre: str, filas: int) -> None:
+    rnd = random.Random(42)
+    inicio = date(2020, 1, 1)
+    with ruta.open("w", encoding="utf-8", newline="") as f:
+        escritor = csv.writer(f)
+        escritor.writerow([c.nombre for c in ESQUEMAS[nombre].columnas])
+        for i in range(filas):
+            fecha = (inicio + timedelta(days=i // 200)).isoformat()
+            escritor.writerow(generar_fila(nombre, rnd, fecha))
+
+
+def tipos_a_convertir(nombre: str, normalizar):
+    """nombre de columna -> función (conversión del tipo o normalización)."""
+    funciones = {}
+    for col in ESQUEMAS[nombre].columnas:
+        if CONVERSION_POR_TIPO[col.tipo] is not None:
+            funciones[col.nombre] = CONVERSION_POR_TIPO[col.tipo]
+        elif col.tipo == "categoria":
+            funciones[col.nombre] = normalizar
+    return funciones
+
+
+def leer_dictreader(ruta: Path, nombre: str, normalizar) -> list:
+    funciones = tipos_a_convertir(nombre, normalizar)
+    registros = []
+    with ruta.open(encoding="utf-8", newline="") as f:
+        for fila in csv.DictReader(f):
+            try:
+                for columna, convertir in funciones.items():
+                    fila[columna] = convertir(fila[columna])
+            except (TypeError, ValueError):
+                continue
+            registros.append(fila)
+    return registros
+
+
+def leer_dict_por_fila(ruta: Path, nombre: str, normalizar) -> list:
+    funciones = tipos_a_convertir(nombre, normalizar)
+    registros = []
+    with ruta.open(encoding="utf-8", newline="") as f:
+        lector = csv.reader(f)
+        encabezado = next(lector)
+        seleccion = list(enumerate(encabezado))
+        tipadas = [c for c in encabezado if c in funciones and funciones[c] is not normalizar]
+        categorias = [c for c in encabezado if funciones.get(c) is normalizar]
+        conversiones = [(encabezado.index(c), c, funciones[c]) for c in tipadas]
+        for fila, valores in validar_filas(lector, conversiones, Validador()):
+            registro = {nombre_col: fila[i] for i, nombre_col in seleccion}
+            registro.update(zip(tipadas, valores))
+            for c in categorias:
+                registro[c] = normalizar(registro[c])
+            registros.append(registro)
+    return registros
+
+
+def leer_esquema(ruta: Path, nombre: str, normalizar) -> list:
+    with ruta.open(encoding="utf-8", newline="") as f:
+        return list(leer_registros(f, ESQUEMAS[nombre], Validador(), normalizar=normalizar))
+
+
+def medir(formas, ruta: Path, nombre: str, normalizar, repeticiones: int, filas: int):
+    """
+    Filas/segundo de cada forma (mejor tiempo). Las formas se turnan en
+    cada repetición para que el ruido de la máquina afecte a todas por igual.
+    """
+    mejores = [float("inf")] * len(formas)
+    for _ in range(repeticiones):
+        for k, (nombre_forma, funcion) in enumerate(formas):
+            inicio = time.perf_counter()
+            registros = funcion(ruta, nombre, normalizar)
+            mejores[k] = min(mejores[k], time.perf_counter() - inicio)
+            if len(registros) != filas:
+                raise SystemExit(
+                    f"❌ {nombre} ({nombre_forma}): se leyeron {len(registros)} filas."
+                )
+    return [filas / t for t in mejores]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filas", type=int, default=300_000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    normalizar = crear_normalizador().normalizar
+    formas = [
+        ("DictReader", leer_dictreader),
+        ("dict por fila", leer_dict_por_fila),
+        ("esquema", leer_esquema),
+    ]
+
+    print(f"Filas por archivo: {args.filas} (mejor de {args.repeticiones})")
+    print(f"  {'esquema':<12}" + "".join(f"{n:>16}" for n, _ in formas) + f"{'mejora':>10}")
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        for nombre in ESQUEMAS:
+            ruta = Path(carpeta) / f"{nombre}.csv"
+            generar_csv(ruta, nombre, args.filas)
+
+            velocidades = medir(formas, ruta, nombre, normalizar, args.repeticiones, args.filas)
+
+            print(
+                f"  {nombre:<12}"
+                + "".join(f"{v:>12,.0f} f/s" for v in velocidades)
+                + f"{velocidades[-1] / velocidades[0]:>9.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
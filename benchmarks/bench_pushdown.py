@@ -0,0 +1,89 @@
+import argparse
+import csv
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+"""
+benchmarks/bench_pushdown.py - Filtros empujados al lector vs filtrar después
+
+Genera un CSV de movimientos de 5 años y compara, para un reporte de
+UN solo mes:
+- leer todo con leer_movimientos y filtrar la lista en Python
+- pedir el mes directamente a leer_movimientos (fecha_desde/fecha_hasta)
+- lo mismo, convirtiendo solo las columnas fecha y monto
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_pushdown.py --filas-por-dia 300
+"""
+
+RUTA_BASE = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(RUTA_BASE / "03_projects" / "P03_finanzas_personales"))
+
+from analizador_finanzas import leer_movimientos  # noqa: E402
+
+CATEGORIAS = ["comida", "transporte", "servicios", "entretenimiento", "otros"]
+
+
+def generar_csv(ruta: Path, anios: int, filas_por_dia: int) -> int:
+    """Escribe un CSV fecha,categoria,monto,detalle y devuelve cuántas filas tiene."""
+    rnd = random.Random(42)
+    inicio = date(2020, 1, 1)
+    dias = 365 * anios
+    with ruta.open("w", encoding="utf-8", newline="") as f:
+        escritor = csv.writer(f)
+        escritor.writerow(["fecha", "categoria", "monto", "detalle"])
+        for d in range(dias):
+            fecha = (inicio + timedelta(days=d)).isoformat()
+            for _ in range(filas_por_dia):
+                escritor.writerow(
+                    [fecha, rnd.choice(CATEGORIAS), rnd.randint(500, 80_000), "detalle demo"]
+                )
+    return dias * filas_por_dia
+
+
+def medir(nombre: str, funcion) -> None:
+    inicio = time.perf_counter()
+    resultado = funcion()
+    segundos = time.perf_counter() - inicio
+    print(f"  {nombre:<38} {segundos:8.3f} s   ({len(resultado)} filas)")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--anios", type=int, default=5)
+    parser.add_argument("--filas-por-dia", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = Path(carpeta) / "movimientos_5_anios.csv"
+        total = generar_csv(ruta, args.anios, args.filas_por_dia)
+        print(f"Archivo generado: {total} filas")
+
+        desde, hasta = "2022-03-01", "2022-03-31"
+        d0, d1 = date.fromisoformat(desde), date.fromisoformat(hasta)
+
+        print(f"\nReporte de un mes ({desde} → {hasta}):")
+        medir(
+            "leer todo + filtrar en Python",
+            lambda: [
+                m for m in leer_movimientos(ruta) if d0 <= m.fecha.date() <= d1
+            ],
+        )
+        medir(
+            "filtro empujado al lector",
+            lambda: leer_movimientos(ruta, fecha_desde=desde, fecha_hasta=hasta),
+        )
+        medir(
+            "filtro + solo fecha y monto",
+            lambda: leer_movimientos(
+                ruta, fecha_desde=desde, fecha_hasta=hasta, columnas=["fecha", "monto"]
+            ),
+        )
+
+
+if __name__ == "__main__":
+    main()
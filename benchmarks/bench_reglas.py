@@ -0,0 +1,122 @@
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+"""
+benchmarks/bench_reglas.py - Número de reglas vs tiempo de evaluación
+
+Compara, para distintas cantidades de reglas de presupuesto:
+- motor compilado, por el mismo camino que usa P03: tabla por
+  (mes, categoría) armada desde las columnas (tabla_desde_columnas, una
+  pasada vectorizada para todas las reglas) y reglas evaluadas como
+  máscaras sobre esa tabla (evaluar_tabla). Se mide cada paso y el total.
+- enfoque ingenuo: un ciclo sobre los movimientos por cada regla
+
+Uso (desde la raíz del repo):
+    python benchmarks/bench_reglas.py --filas 200000
+"""
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import numpy as np  # noqa: E402
+
+from comun.dinero import ColumnaDinero  # noqa: E402
+from comun.reglas_presupuesto import (  # noqa: E402
+    OPERADORES,
+    MotorReglas,
+    Regla,
+    tabla_desde_columnas,
+)
+
+CATEGORIAS = [f"categoria_{i}" for i in range(50)]
+
+
+def generar_columnas(filas: int):
+    rnd = random.Random(42)
+    meses = [202000 + (a * 100) + m for a in range(5) for m in range(1, 13)]
+    return (
+        np.array([rnd.choice(meses) for _ in range(filas)], dtype=np.int64),
+        [rnd.choice(CATEGORIAS) for _ in range(filas)],
+        ColumnaDinero([rnd.randint(500, 80_000) for _ in range(filas)]),
+    )
+
+
+def generar_reglas(cantidad: int):
+    rnd = random.Random(7)
+    return [
+        Regla(
+            nombre=f"regla {i}",
+            categoria=rnd.choice(CATEGORIAS),
+            metrica=rnd.choice(["total", "participacion", "maximo"]),
+            operador=">",
+            limite=rnd.choice([1_000_000.0, 2.0, 79_000.0]),
+        )
+        for i in range(cantidad)
+    ]
+
+
+def evaluar_ingenuo(reglas, meses, categorias, montos):
+    """Un recorrido completo de las filas por cada regla."""
+    alertas = 0
+    for regla in reglas:
+        total_mes, valor_mes = {}, {}
+        for mes, cat, monto in zip(meses, categorias, montos):
+            total_mes[mes] = total_mes.get(mes, 0.0) + monto
+            if cat != regla.categoria:
+                continue
+            if regla.metrica == "maximo":
+                valor_mes[mes] = max(valor_mes.get(mes, 0.0), monto)
+            else:
+                valor_mes[mes] = valor_mes.get(mes, 0.0) + monto
+        comparar = OPERADORES[regla.operador]
+        for mes, valor in valor_mes.items():
+            if regla.metrica == "participacion":
+                valor = valor / total_mes[mes] * 100
+            alertas += comparar(valor, regla.limite)
+    return alertas
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--filas", type=int, default=200_000)
+    parser.add_argument("--max-ingenuo", type=int, default=10,
+                        help="no correr el enfoque ingenuo con más reglas que esto")
+    args = parser.parse_args()
+
+    columnas = generar_columnas(args.filas)
+    meses, categorias, montos = columnas
+    columnas_python = (meses.tolist(), categorias, montos.valores.tolist())
+    print(f"Filas: {args.filas}\n")
+    print(
+        f"  {'reglas':>7} {'tabla (s)':>10} {'reglas (s)':>11} {'compilado (s)':>14} "
+        f"{'ingenuo (s)':>12} {'alertas':>8}"
+    )
+
+    for cantidad in (1, 10, 100, 1000):
+        reglas = generar_reglas(cantidad)
+
+        inicio = time.perf_counter()
+        motor = MotorReglas(reglas)
+        tabla = tabla_desde_columnas(*columnas)
+        t_tabla = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        alertas = motor.evaluar_tabla(tabla)
+        t_reglas = time.perf_counter() - inicio
+
+        t_ingenuo = "-"
+        if cantidad <= args.max_ingenuo:
+            inicio = time.perf_counter()
+            evaluar_ingenuo(reglas, *columnas_python)
+            t_ingenuo = f"{time.perf_counter() - inicio:12.3f}"
+
+        print(
+            f"  {cantidad:>7} {t_tabla:10.3f} {t_reglas:11.3f} {t_tabla + t_reglas:14.3f} "
+            f"{t_ingenuo:>12} {len(alertas):>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""
+comun - Utilidades compartidas por los scripts de Franco DevAI
+
+Los scripts de 02_data/ y 03_projects/ agregan la carpeta raíz del repo
+al sys.path para poder importar desde aquí.
+
+Módulos:
+- categorias: normalización de categorías con caché y códigos enteros.
+- dinero: montos exactos como enteros (unidades menores) en array("q").
+- formato: formato de montos en CLP para los reportes.
+- compresion: lectura de .csv.gz / .csv.zst descomprimiendo en segundo plano.
+- expresiones: métricas escritas como texto y evaluadas sobre columnas (numpy).
+- esquemas: columnas y tipos de cada CSV del repo y lectores generados para cada uno.
+- filtros: filtros de fecha/categoría y columnas aplicados dentro de los lectores.
+- validacion: conversión por lotes, contadores de errores y CSV de cuarentena.
+- reglas_presupuesto: reglas de presupuesto (JSON/YAML) evaluadas en una pasada.
+- parciales: formato binario versionado para combinar resultados de varias máquinas.
+- frecuentes: top-K aproximado (Space-Saving) con memoria fija y combinable.
+- flujo_caja: merge k-way de gastos e ingresos con saldo y tasa de ahorro.
+"""
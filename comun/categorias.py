@@ -0,0 +1,174 @@
+import csv
+from pathlib import Path
+from typing import Dict, List, Optional
+
+"""
+comun/categorias.py - Normalización de categorías
+
+Objetivo:
+- Que "Comida", "comida " y "COMIDA" cuenten como una sola categoría.
+- Normalizar cada texto distinto UNA sola vez por ejecución (caché),
+  sin importar cuántas filas tenga el CSV.
+- Internar las categorías canónicas: cada una existe UNA sola vez en
+  memoria (con un código entero pequeño) y normalizar() devuelve siempre
+  ese mismo objeto str. Los agrupamientos de los scripts siguen usando el
+  texto como llave, pero al ser el mismo objeto (y con su hash ya
+  calculado) el dict lo encuentra por identidad, sin comparar caracteres.
+- Aceptar un archivo opcional de alias (ej: "almuerzo" -> "comida").
+
+Formato del archivo de alias (CSV):
+    alias,canonica
+    almuerzo,comida
+    locomocion,transporte
+"""
+
+
+# ==============================
+# Configuración
+# ==============================
+
+# Máximo de textos crudos distintos que se guardan en la caché.
+# Si se supera, se descartan los más antiguos (orden de inserción).
+TAMANO_CACHE_POR_DEFECTO = 10_000
+
+# Archivo de alias que se usa si existe (es opcional)
+RUTA_ALIAS_POR_DEFECTO = Path(__file__).resolve().parent / "alias_categorias.csv"
+
+
+# ==============================
+# Funciones utilitarias
+# ==============================
+
+def limpiar_categoria(texto: str) -> str:
+    """
+    Limpieza básica (misma idea que limpiar_nombre_archivo de 01_basics):
+    - Quita espacios al inicio/fin
+    - Reemplaza espacios múltiples por uno solo
+    - Pasa todo a minúsculas
+    """
+    return " ".join(texto.split()).casefold()
+
+
+def cargar_alias(ruta_alias: Path) -> Dict[str, str]:
+    """
+    Lee un CSV con columnas alias,canonica y devuelve un diccionario
+    alias limpio -> categoría canónica limpia.
+    """
+    if not ruta_alias.exists():
+        raise FileNotFoundError(f"No se encontró el archivo de alias: {ruta_alias}")
+
+    alias: Dict[str, str] = {}
+
+    with ruta_alias.open(encoding="utf-8") as f:
+        lector = csv.DictReader(f)
+
+        if lector.fieldnames is None or not {"alias", "canonica"}.issubset(
+            set(lector.fieldnames)
+        ):
+            raise ValueError(
+                "El archivo de alias debe contener las columnas: alias, canonica. "
+                f"Columnas encontradas: {lector.fieldnames}"
+            )
+
+        for fila in lector:
+            alias[limpiar_categoria(fila["alias"])] = limpiar_categoria(
+                fila["canonica"]
+            )
+
+    return alias
+
+
+# ==============================
+# Normalizador con caché
+# ==============================
+
+class NormalizadorCategorias:
+    """
+    Convierte textos crudos en categorías canónicas y códigos enteros.
+
+    Uso típico:
+        norm = NormalizadorCategorias()
+        norm.normalizar(" Comida ")   # -> "comida"
+        norm.codigo("COMIDA")         # -> 0
+        norm.nombre(0)                # -> "comida"
+    """
+
+    def __init__(
+        self,
+        alias: Optional[Dict[str, str]] = None,
+        tamano_cache: int = TAMANO_CACHE_POR_DEFECTO,
+    ) -> None:
+        if tamano_cache <= 0:
+            raise ValueError("tamano_cache debe ser mayor que 0.")
+
+        self.alias: Dict[str, str] = dict(alias) if alias else {}
+        self.tamano_cache = tamano_cache
+
+        # texto crudo -> código de la categoría canónica
+        self._cache: Dict[str, int] = {}
+
+        # categoría canónica <-> código
+        self._codigos: Dict[str, int] = {}
+        self._nombres: List[str] = []
+
+    @classmethod
+    def desde_archivo(
+        cls, ruta_alias: Optional[Path], tamano_cache: int = TAMANO_CACHE_POR_DEFECTO
+    ) -> "NormalizadorCategorias":
+        """Crea un normalizador leyendo los alias desde un CSV (si se entrega)."""
+        alias = cargar_alias(ruta_alias) if ruta_alias is not None else None
+        return cls(alias=alias, tamano_cache=tamano_cache)
+
+    def _internar(self, canonica: str) -> int:
+        """Devuelve el código de una categoría canónica, creándolo si es nueva."""
+        codigo = self._codigos.get(canonica)
+        if codigo is None:
+            codigo = len(self._nombres)
+            self._codigos[canonica] = codigo
+            self._nombres.append(canonica)
+        return codigo
+
+    def codigo(self, texto: str) -> int:
+        """Código entero de la categoría canónica correspondiente a `texto`."""
+        codigo = self._cache.get(texto)
+        if codigo is not None:
+            return codigo
+
+        # Camino lento: solo la primera vez que aparece este texto crudo
+        limpio = limpiar_categoria(texto)
+        codigo = self._internar(self.alias.get(limpio, limpio))
+
+        # Caché acotada: si está llena descartamos la entrada más antigua
+        if len(self._cache) >= self.tamano_cache:
+            del self._cache[next(iter(self._cache))]
+        self._cache[texto] = codigo
+
+        return codigo
+
+    def normalizar(self, texto: str) -> str:
+        """Categoría canónica (str) correspondiente a `texto`."""
+        return self._nombres[self.codigo(texto)]
+
+    def nombre(self, codigo: int) -> str:
+        """Categoría canónica a partir de su código."""
+        return self._nombres[codigo]
+
+    @property
+    def categorias(self) -> List[str]:
+        """Lista de categorías canónicas, indexada por código."""
+        return list(self._nombres)
+
+    def __len__(self) -> int:
+        return len(self._nombres)
+
+
+def crear_normalizador(
+    ruta_alias: Path = RUTA_ALIAS_POR_DEFECTO,
+) -> NormalizadorCategorias:
+    """
+    Normalizador listo para los scripts: usa el archivo de alias
+    solo si existe, sin obligar a crearlo.
+    """
+    return NormalizadorCategorias.desde_archivo(
+        ruta_alias if ruta_alias.exists() else None
+    )
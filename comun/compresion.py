@@ -0,0 +1,186 @@
+import gzip
+import io
+import queue
+import threading
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+try:
+    import zstandard
+except ImportError:  # zstandard es opcional: sin él no se leen archivos .zst
+    zstandard = None
+
+"""
+comun/compresion.py - Lectura de CSV comprimidos sin descomprimir a disco
+
+Objetivo:
+- Leer directamente exportaciones .csv.gz y .csv.zst.
+- Detectar la compresión por los primeros bytes del archivo ("magic
+  bytes"), no por la extensión.
+- Descomprimir en un hilo aparte que va llenando una cola acotada de
+  bloques, así la descompresión ocurre al mismo tiempo que el parseo
+  del CSV y la memoria usada no crece con el tamaño del archivo.
+
+Uso típico en un lector:
+    with abrir_texto(ruta_csv) as f:
+        lector = csv.reader(f)
+"""
+
+# Primeros bytes de cada formato
+MAGIC_GZIP = b"\x1f\x8b"
+MAGIC_ZSTD = b"\x28\xb5\x2f\xfd"
+
+# Tamaño de cada bloque descomprimido y cuántos bloques puede haber en cola
+TAMANO_BLOQUE = 1 << 20
+MAX_BLOQUES_EN_COLA = 8
+
+_FIN = object()
+
+
+def detectar_compresion(ruta: Union[str, Path]) -> Optional[str]:
+    """Devuelve "gzip", "zstd" o None (sin compresión) según los magic bytes."""
+    with open(ruta, "rb") as f:
+        inicio = f.read(4)
+    if inicio.startswith(MAGIC_GZIP):
+        return "gzip"
+    if inicio.startswith(MAGIC_ZSTD):
+        return "zstd"
+    return None
+
+
+def _abrir_descompresor(ruta: Union[str, Path], compresion: str) -> BinaryIO:
+    """Abre un flujo binario que entrega los bytes ya descomprimidos."""
+    if compresion == "gzip":
+        return gzip.open(ruta, "rb")
+
+    if zstandard is None:
+        raise ImportError(
+            f"{ruta} está comprimido con zstd: instala 'zstandard' (pip install zstandard)."
+        )
+    crudo = open(ruta, "rb")
+    try:
+        return zstandard.ZstdDecompressor().stream_reader(crudo, closefd=True)
+    except BaseException:
+        crudo.close()
+        raise
+
+
+class LectorEnSegundoPlano(io.RawIOBase):
+    """
+    Flujo binario de solo lectura alimentado por un hilo productor.
+
+    El hilo lee bloques de `fuente` (por ejemplo un gzip) y los pone en
+    una cola con capacidad `max_bloques`. Si el parseo va más lento, el
+    hilo se bloquea esperando espacio: la memoria queda acotada a
+    max_bloques * tamano_bloque.
+    """
+
+    def __init__(
+        self,
+        fuente: BinaryIO,
+        tamano_bloque: int = TAMANO_BLOQUE,
+        max_bloques: int = MAX_BLOQUES_EN_COLA,
+    ) -> None:
+        super().__init__()
+        self._fuente = fuente
+        self._tamano_bloque = tamano_bloque
+        self._cola: "queue.Queue" = queue.Queue(maxsize=max_bloques)
+        self._detener = threading.Event()
+        self._pendiente = memoryview(b"")
+        self._terminado = False
+
+        self._hilo = threading.Thread(target=self._producir, daemon=True)
+        self._hilo.start()
+
+    # ---- hilo productor ----
+
+    def _poner(self, item) -> bool:
+        """Pone un item en la cola; se rinde si el lector ya se cerró."""
+        while not self._detener.is_set():
+            try:
+                self._cola.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _producir(self) -> None:
+        try:
+            while True:
+                bloque = self._fuente.read(self._tamano_bloque)
+                if not bloque or not self._poner(bloque):
+                    break
+        except BaseException as error:  # se re-lanza en el hilo que lee
+            self._poner(error)
+        finally:
+            self._fuente.close()
+            self._poner(_FIN)
+
+    # ---- interfaz de archivo ----
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, destino) -> int:
+        if not self._pendiente:
+            if self._terminado:
+                return 0
+            item = self._cola.get()
+            if item is _FIN:
+                self._terminado = True
+                return 0
+            if isinstance(item, BaseException):
+                self._terminado = True
+                raise item
+            self._pendiente = memoryview(item)
+
+        n = min(len(destino), len(self._pendiente))
+        destino[:n] = self._pendiente[:n]
+        self._pendiente = self._pendiente[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._detener.set()
+            # Vaciamos la cola para que el productor no quede bloqueado
+            while self._hilo.is_alive():
+                try:
+                    self._cola.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            self._hilo.join()
+        super().close()
+
+
+def _abrir_en_segundo_plano(ruta: Union[str, Path], compresion: str) -> BinaryIO:
+    crudo = LectorEnSegundoPlano(_abrir_descompresor(ruta, compresion))
+    return io.BufferedReader(crudo, buffer_size=TAMANO_BLOQUE)
+
+
+def abrir_binario(ruta: Union[str, Path]) -> BinaryIO:
+    """
+    Abre un archivo para lectura binaria, descomprimiendo en segundo plano
+    si es gzip o zstd. Sin compresión se usa open() normal.
+    """
+    compresion = detectar_compresion(ruta)
+    if compresion is None:
+        return open(ruta, "rb")
+    return _abrir_en_segundo_plano(ruta, compresion)
+
+
+def abrir_texto(ruta: Union[str, Path], encoding: str = "utf-8") -> io.TextIOBase:
+    """
+    Igual que open(ruta, encoding=..., newline="") pero acepta archivos
+    comprimidos (.gz / .zst, detectados por contenido).
+
+    newline="" es lo que pide csv: los saltos de línea llegan tal cual
+    (también los de Windows) y csv los respeta dentro de los campos entre
+    comillas.
+    """
+    compresion = detectar_compresion(ruta)
+    if compresion is None:
+        return open(ruta, "r", encoding=encoding, newline="")
+
+    return io.TextIOWrapper(
+        _abrir_en_segundo_plano(ruta, compresion), encoding=encoding, newline=""
+    )
@@ -0,0 +1,241 @@
+from decimal import Decimal, InvalidOperation
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+"""
+comun/dinero.py - Dinero como enteros (unidades menores) en arreglos compactos
+
+Objetivo:
+- Dejar de sumar montos como float (con cientos de millones de filas la
+  suma en float "deriva" y cada float de Python ocupa 24 bytes).
+- Guardar cada monto como un entero de 64 bits en "unidades menores":
+    * CLP no tiene decimales -> 1 unidad = 1 peso
+    * USD tendría 2 decimales -> 1 unidad = 1 centavo
+- Sumas, promedios y porcentajes exactos, con control de desborde
+  (el resultado tiene que caber en int64).
+- Columnas de montos en arreglos numpy int64 (ColumnaDinero): 8 bytes
+  por monto, sin objetos, y sumas (totales, por tramos o por grupo)
+  vectorizadas.
+
+Desborde en las sumas vectorizadas: numpy no avisa si una suma int64 se
+pasa de rango. Antes de sumar se acota el peor caso (monto más grande en
+valor absoluto x cantidad de montos): si cabe en int64, ninguna suma
+parcial puede desbordar y se suma con numpy; si no, se suma con enteros
+de Python (exactos) y se verifica el resultado.
+
+Los montos se leen desde el TEXTO del CSV, nunca pasando por float.
+Regla estricta: un monto con más decimales que la moneda (ej: "8500.5"
+en CLP) es un monto inválido, no se redondea. Esas filas quedan en la
+cuarentena como monto_invalido (antes float() las aceptaba tal cual).
+"""
+
+DECIMALES_CLP = 0
+
+MIN_INT64 = -(1 << 63)
+MAX_INT64 = (1 << 63) - 1
+
+
+# ==============================
+# Conversión
+# ==============================
+
+def verificar_int64(unidades: int) -> int:
+    """Devuelve `unidades` si cabe en int64; si no, lanza OverflowError."""
+    if not MIN_INT64 <= unidades <= MAX_INT64:
+        raise OverflowError(f"El monto {unidades} no cabe en 64 bits.")
+    return unidades
+
+
+def parsear_monto(texto: Optional[str], decimales: int = DECIMALES_CLP) -> int:
+    """
+    Convierte el texto de un monto a unidades menores, de forma exacta.
+
+        parsear_monto("8500")            -> 8500
+        parsear_monto("12.50", 2)        -> 1250
+        parsear_monto("8500.5")          -> ValueError (CLP no tiene decimales)
+
+    Lanza TypeError/ValueError igual que int() para montos inválidos,
+    así funciona directo con comun.validacion.
+    """
+    # Camino rápido: la gran mayoría de los montos son enteros simples.
+    # int(None) lanza TypeError, que es lo que esperamos para celdas vacías.
+    try:
+        unidades = int(texto)
+    except ValueError:
+        unidades = _parsear_con_decimales(texto, decimales)
+    else:
+        if decimales:
+            unidades *= 10 ** decimales
+
+    if MIN_INT64 <= unidades <= MAX_INT64:
+        return unidades
+    raise OverflowError(f"El monto {texto!r} no cabe en 64 bits.")
+
+
+def _parsear_con_decimales(texto: str, decimales: int) -> int:
+    """Camino lento de parsear_monto: montos con punto decimal."""
+    try:
+        valor = Decimal(texto.strip())
+    except InvalidOperation:
+        raise ValueError(f"Monto inválido: {texto!r}") from None
+
+    if not valor.is_finite():
+        raise ValueError(f"Monto inválido: {texto!r}")
+
+    unidades = valor.scaleb(decimales)
+    if unidades != unidades.to_integral_value():
+        raise ValueError(f"Monto con más de {decimales} decimales: {texto!r}")
+
+    return int(unidades)
+
+
+def a_decimal(unidades: int, decimales: int = DECIMALES_CLP) -> Decimal:
+    """Unidades menores -> Decimal exacto (ej: 1250 con 2 decimales -> 12.50)."""
+    return Decimal(unidades).scaleb(-decimales)
+
+
+# ==============================
+# Operaciones exactas
+# ==============================
+
+def _sin_riesgo_de_desborde(valores: np.ndarray) -> bool:
+    """True si ninguna suma de estos valores puede salirse de int64."""
+    if len(valores) == 0:
+        return True
+    mayor = max(int(valores.max()), -int(valores.min()))
+    return mayor * len(valores) <= MAX_INT64
+
+
+def suma_exacta(montos: Iterable[int]) -> int:
+    """
+    Suma exacta de unidades menores, verificando que quepa en int64.
+
+    Con un arreglo numpy (ej: ColumnaDinero.valores) la suma es
+    vectorizada; con cualquier otro iterable se suman enteros de Python
+    (sin desborde intermedio) y solo se verifica el resultado.
+    """
+    if isinstance(montos, np.ndarray):
+        if _sin_riesgo_de_desborde(montos):
+            return int(montos.sum())
+        montos = montos.tolist()
+    return verificar_int64(sum(montos))
+
+
+def sumar_tramos(valores: np.ndarray, inicios: np.ndarray) -> np.ndarray:
+    """
+    Suma de cada tramo consecutivo de `valores` (np.add.reduceat): el
+    tramo k va de inicios[k] hasta el inicio siguiente. Exacta y con
+    control de desborde.
+    """
+    if len(inicios) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if _sin_riesgo_de_desborde(valores):
+        return np.add.reduceat(valores, inicios)
+
+    # Camino lento (montos enormes): enteros de Python tramo por tramo
+    fines = [*inicios[1:].tolist(), len(valores)]
+    lista = valores.tolist()
+    return np.array(
+        [verificar_int64(sum(lista[i:j])) for i, j in zip(inicios.tolist(), fines)],
+        dtype=np.int64,
+    )
+
+
+def agregar_por_grupo(
+    claves: np.ndarray, valores: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Agrupa `valores` por `claves` (enteros) de forma vectorizada.
+
+    Retorna (claves distintas en orden creciente, total, conteo, máximo)
+    de cada grupo. Los totales son exactos y con control de desborde.
+    """
+    if len(claves) != len(valores):
+        raise ValueError("claves y valores deben tener el mismo largo.")
+
+    orden = np.argsort(claves, kind="stable")
+    claves_ordenadas = claves[orden]
+    valores_ordenados = valores[orden]
+
+    cambia = np.empty(len(claves), dtype=bool)
+    cambia[:1] = True
+    np.not_equal(claves_ordenadas[1:], claves_ordenadas[:-1], out=cambia[1:])
+    inicios = np.flatnonzero(cambia)
+
+    totales = sumar_tramos(valores_ordenados, inicios)
+    conteos = np.diff(np.append(inicios, len(claves)))
+    maximos = (
+        np.maximum.reduceat(valores_ordenados, inicios)
+        if len(inicios) else np.zeros(0, dtype=np.int64)
+    )
+    return claves_ordenadas[inicios], totales, conteos, maximos
+
+
+def promedio(total: int, cantidad: int) -> float:
+    """Promedio en unidades menores (float solo al final, para mostrar)."""
+    return total / cantidad if cantidad else 0.0
+
+
+def porcentaje(parte: int, total: int) -> float:
+    """Qué porcentaje de `total` representa `parte` (0 si total es 0)."""
+    return (parte * 100) / total if total else 0.0
+
+
+class ColumnaDinero:
+    """
+    Columna de montos en unidades menores, guardada en un arreglo numpy
+    int64 (`valores`).
+
+    Uso típico:
+        col = ColumnaDinero.desde_textos(["8500", "1200"])
+        col.suma()                    # -> 9700
+        col.sumar_por_grupo(codigos)  # -> totales por código de grupo
+    """
+
+    __slots__ = ("valores", "decimales")
+
+    def __init__(self, valores: Iterable[int] = (), decimales: int = DECIMALES_CLP) -> None:
+        # np.fromiter lanza OverflowError si un valor no cabe en int64
+        if isinstance(valores, np.ndarray):
+            self.valores = valores.astype(np.int64, casting="safe", copy=False)
+        else:
+            self.valores = np.fromiter(valores, dtype=np.int64)
+        self.decimales = decimales
+
+    @classmethod
+    def desde_textos(
+        cls, textos: Iterable[Optional[str]], decimales: int = DECIMALES_CLP
+    ) -> "ColumnaDinero":
+        """Columna a partir del texto de cada monto (ver parsear_monto)."""
+        return cls((parsear_monto(t, decimales) for t in textos), decimales)
+
+    def suma(self) -> int:
+        return suma_exacta(self.valores)
+
+    def promedio(self) -> float:
+        return promedio(self.suma(), len(self.valores))
+
+    def maximo(self) -> int:
+        return int(self.valores.max())
+
+    def posicion_maximo(self) -> int:
+        """Posición del monto más alto (ante empate, la primera, como max())."""
+        return int(self.valores.argmax())
+
+    def sumar_por_grupo(self, codigos: np.ndarray, num_grupos: int) -> List[int]:
+        """
+        Total por grupo, con `codigos` = grupo de cada fila (0..num_grupos-1).
+        Los grupos sin filas quedan en 0.
+        """
+        grupos, totales, _, _ = agregar_por_grupo(np.asarray(codigos), self.valores)
+        resultado = [0] * num_grupos
+        for grupo, total in zip(grupos.tolist(), totales.tolist()):
+            resultado[grupo] = total
+        return resultado
+
+    def __len__(self) -> int:
+        return len(self.valores)
+
+    def __iter__(self):
+        return iter(self.valores.tolist())
@@ -0,0 +1,462 @@
+import csv
+from collections import namedtuple
+from datetime import date, datetime
+from functools import lru_cache
+from itertools import islice, starmap
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    TextIO,
+    Tuple,
+)
+
+from comun.dinero import parsear_monto
+from comun.filtros import FechaFiltro, crear_predicado, filas_crudas, prefiltrar_lineas
+from comun.validacion import (
+    TAMANO_LOTE_POR_DEFECTO,
+    Conversion,
+    Validador,
+    validar_filas,
+)
+
+"""
+comun/esquemas.py - Registro de esquemas CSV y conversores generados
+
+Objetivo:
+- Declarar UNA vez las columnas y tipos de cada formato de archivo del
+  repo (gastos, movimientos, eventos_dj, posts) en vez de que cada
+  lector repita sus chequeos de columnas y sus int()/parsear_monto().
+- Para cada encabezado concreto se genera (una sola vez, con caché) un
+  conversor especializado: sabe de memoria en qué posición está cada
+  columna, qué columnas convertir y cómo armar el registro.
+- Las filas se leen con csv.reader (listas, posicionales) y se entregan
+  como namedtuple: sin un dict por fila como con DictReader.
+
+Tipos de columna:
+- texto:      se deja tal cual
+- categoria:  texto normalizado con el normalizador del script (si se entrega)
+- entero:     int()
+- dinero:     parsear_monto() (pesos enteros exactos, ver comun/dinero.py)
+- fecha:      date.fromisoformat()
+- fecha_hora: datetime.fromisoformat()
+
+Uso típico:
+    with abrir_texto(ruta) as f, usar_validador(None) as v:
+        for mov in leer_registros(f, MOVIMIENTOS, v, normalizar=normalizar):
+            ...
+"""
+
+# Función de conversión de cada tipo (None = la columna queda como texto)
+CONVERSION_POR_TIPO: Dict[str, Optional[Callable[[str], Any]]] = {
+    "texto": None,
+    "categoria": None,
+    "entero": int,
+    "dinero": parsear_monto,
+    "fecha": date.fromisoformat,
+    "fecha_hora": datetime.fromisoformat,
+}
+
+
+class EncabezadoInvalido(ValueError):
+    """Al CSV le faltan columnas obligatorias del esquema."""
+
+
+class Columna(NamedTuple):
+    nombre: str
+    tipo: str = "texto"
+    obligatoria: bool = True
+    # Motivo que se anota en la cuarentena; por defecto "<nombre>_invalido"
+    motivo: str = ""
+
+
+class Conversor(NamedTuple):
+    """
+    Conversor generado para un encabezado concreto.
+
+    - convertir(fila): fila cruda -> registro, todo en una llamada
+      (lanza ValueError/TypeError/OverflowError si un valor es inválido
+      e IndexError si a la fila le falta alguna columna pedida)
+    - conversiones: (posición, motivo, función) para validar_filas
+    - construir(fila, valores): arma el registro a partir de la fila cruda
+      y de los valores ya convertidos por validar_filas (camino lento,
+      solo para los lotes con errores)
+    - largo_minimo: celdas que debe traer una fila para tener todas las
+      columnas pedidas (última posición pedida + 1)
+    """
+    registro: type
+    columnas: Tuple[str, ...]
+    largo_minimo: int
+    conversiones: Tuple[Conversion, ...]
+    convertir: Callable[[List[str]], Any]
+    construir: Callable[[List[str], Tuple[Any, ...]], Any]
+
+
+# ==============================
+# Esquema
+# ==============================
+
+class Esquema:
+    """
+    Columnas y tipos de un formato de CSV.
+
+    Los registros son una namedtuple con TODAS las columnas del esquema,
+    en el orden declarado; las columnas que no se pidieron (o que son
+    opcionales y no vienen en el archivo) quedan en None.
+    """
+
+    def __init__(self, nombre: str, columnas: Sequence[Columna], nombre_registro: str) -> None:
+        desconocidos = [c.tipo for c in columnas if c.tipo not in CONVERSION_POR_TIPO]
+        if desconocidos:
+            raise ValueError(
+                f"Tipos de columna desconocidos en '{nombre}': {', '.join(desconocidos)}. "
+                f"Tipos válidos: {', '.join(CONVERSION_POR_TIPO)}"
+            )
+
+        self.nombre = nombre
+        self.columnas: Tuple[Columna, ...] = tuple(columnas)
+        self.registro = namedtuple(nombre_registro, [c.nombre for c in self.columnas])
+
+    def __repr__(self) -> str:
+        return f"Esquema({self.nombre!r}, {[c.nombre for c in self.columnas]})"
+
+    @property
+    def obligatorias(self) -> List[str]:
+        return [c.nombre for c in self.columnas if c.obligatoria]
+
+    def columnas_de_tipo(self, *tipos: str) -> List[str]:
+        """Nombres de las columnas de los tipos indicados (ej: "entero")."""
+        return [c.nombre for c in self.columnas if c.tipo in tipos]
+
+    def verificar_encabezado(self, encabezado: Sequence[str]) -> None:
+        """Lanza EncabezadoInvalido si faltan columnas obligatorias."""
+        presentes = set(encabezado)
+        faltantes = [c for c in self.obligatorias if c not in presentes]
+        if faltantes:
+            raise EncabezadoInvalido(
+                f"El CSV de {self.nombre} debe contener las columnas: "
+                f"{', '.join(self.obligatorias)}. Faltan: {', '.join(faltantes)}. "
+                f"Columnas encontradas: {list(encabezado)}"
+            )
+
+    def conversor(
+        self,
+        encabezado: Sequence[str],
+        columnas: Optional[Iterable[str]] = None,
+        normalizar: Optional[Callable[[str], str]] = None,
+    ) -> Conversor:
+        """
+        Conversor para este encabezado (se genera la primera vez y luego
+        sale de caché).
+
+        - columnas: solo se convierten estas (las demás quedan en None)
+        - normalizar: función para las columnas de tipo "categoria"
+        """
+        self.verificar_encabezado(encabezado)
+        pedidas = None if columnas is None else tuple(dict.fromkeys(columnas))
+        return _generar_conversor(self, tuple(encabezado), pedidas, normalizar)
+
+
+@lru_cache(maxsize=128)
+def _generar_conversor(
+    esquema: Esquema,
+    encabezado: Tuple[str, ...],
+    pedidas: Optional[Tuple[str, ...]],
+    normalizar: Optional[Callable[[str], str]],
+) -> Conversor:
+    """
+    Escribe y compila las funciones específicas para este encabezado, por
+    ejemplo para movimientos:
+
+        def convertir(fila):
+            if fila[3] is None:
+                raise IndexError
+            return nuevo(registro, (c0(fila[0]), normalizar(fila[1]), c1(fila[2]), fila[3]))
+
+        def construir(fila, valores):
+            return nuevo(registro, (valores[0], normalizar(fila[1]), valores[1], fila[3]))
+
+    Así cada fila cuesta una sola llamada, sin buscar posiciones ni tipos.
+    El chequeo de la última posición pedida detecta las filas cortas
+    rellenadas con None (ver filtros.filas_crudas); las que no se
+    rellenaron ya fallan con IndexError al indexar.
+    `nuevo` es tuple.__new__: arma la namedtuple sin pasar por su __new__
+    (que es una función Python más por fila).
+    """
+    posiciones = {nombre: i for i, nombre in enumerate(encabezado)}
+    en_esquema = {c.nombre for c in esquema.columnas}
+
+    if pedidas is None:
+        pedidas = tuple(c.nombre for c in esquema.columnas if c.nombre in posiciones)
+    else:
+        desconocidas = [c for c in pedidas if c not in en_esquema or c not in posiciones]
+        if desconocidas:
+            raise ValueError(
+                f"Columnas pedidas que no están en el CSV de {esquema.nombre}: "
+                f"{', '.join(desconocidas)}. Columnas encontradas: {list(encabezado)}"
+            )
+
+    # Las funciones de conversión (c0, c1, ...) se pasan como argumentos
+    # por defecto: dentro de la función son variables locales, que es lo
+    # más rápido de leer en Python
+    directos: List[str] = []
+    desde_valores: List[str] = []
+    conversiones: List[Conversion] = []
+
+    for col in esquema.columnas:
+        if col.nombre not in pedidas or col.nombre not in posiciones:
+            directos.append("None")
+            desde_valores.append("None")
+            continue
+
+        i = posiciones[col.nombre]
+        convertir = CONVERSION_POR_TIPO[col.tipo]
+        if convertir is not None:
+            k = len(conversiones)
+            directos.append(f"c{k}(fila[{i}])")
+            desde_valores.append(f"valores[{k}]")
+            conversiones.append((i, col.motivo or f"{col.nombre}_invalido", convertir))
+            continue
+
+        if col.tipo == "categoria" and normalizar is not None:
+            texto = f"normalizar(fila[{i}])"
+        else:
+            texto = f"fila[{i}]"
+        directos.append(texto)
+        desde_valores.append(texto)
+
+    largo_minimo = max((posiciones[c] for c in pedidas), default=-1) + 1
+    chequeo = (
+        f"    if fila[{largo_minimo - 1}] is None:\n"
+        "        raise IndexError\n"
+        if largo_minimo else ""
+    )
+
+    locales = "nuevo=nuevo, registro=registro, normalizar=normalizar"
+    funciones = "".join(f", c{k}=c{k}" for k in range(len(conversiones)))
+    codigo = (
+        f"def convertir(fila, {locales}{funciones}):\n"
+        f"{chequeo}"
+        f"    return nuevo(registro, ({', '.join(directos)},))\n"
+        "\n"
+        f"def construir(fila, valores, {locales}):\n"
+        f"    return nuevo(registro, ({', '.join(desde_valores)},))\n"
+    )
+    espacio: Dict[str, Any] = {
+        "nuevo": tuple.__new__,
+        "registro": esquema.registro,
+        "normalizar": normalizar,
+    }
+    espacio.update((f"c{k}", funcion) for k, (_, _, funcion) in enumerate(conversiones))
+    exec(compile(codigo, f"<conversor {esquema.nombre}>", "exec"), espacio)
+
+    return Conversor(
+        registro=esquema.registro,
+        columnas=pedidas,
+        largo_minimo=largo_minimo,
+        conversiones=tuple(conversiones),
+        convertir=espacio["convertir"],
+        construir=espacio["construir"],
+    )
+
+
+# ==============================
+# Registro de esquemas
+# ==============================
+
+ESQUEMAS: Dict[str, Esquema] = {}
+
+
+def registrar_esquema(esquema: Esquema) -> Esquema:
+    if esquema.nombre in ESQUEMAS:
+        raise ValueError(f"Ya existe un esquema llamado '{esquema.nombre}'.")
+    ESQUEMAS[esquema.nombre] = esquema
+    return esquema
+
+
+def obtener_esquema(nombre: str) -> Esquema:
+    try:
+        return ESQUEMAS[nombre]
+    except KeyError:
+        raise ValueError(
+            f"Esquema desconocido: '{nombre}'. Disponibles: {', '.join(ESQUEMAS)}"
+        ) from None
+
+
+# 02_data/gastos_demo.csv (analisis_gastos.py y P02_dashboard.py)
+GASTOS = registrar_esquema(Esquema(
+    "gastos",
+    [
+        Columna("categoria", "categoria"),
+        Columna("monto", "dinero"),
+        Columna("detalle"),
+    ],
+    nombre_registro="Gasto",
+))
+
+# 03_projects/P03_finanzas_personales/gastos_demo2.csv (analizador_finanzas.py, flujo_caja)
+MOVIMIENTOS = registrar_esquema(Esquema(
+    "movimientos",
+    [
+        Columna("fecha", "fecha_hora", motivo="fecha_invalida"),
+        Columna("categoria", "categoria"),
+        Columna("monto", "dinero"),
+        Columna("detalle"),
+    ],
+    nombre_registro="Movimiento",
+))
+
+# 02_data/eventos_dj_demo.csv (P03_ingresos_dj.py, flujo_caja)
+EVENTOS_DJ = registrar_esquema(Esquema(
+    "eventos_dj",
+    [
+        Columna("fecha", "fecha", motivo="fecha_invalida"),
+        Columna("lugar", "categoria"),
+        Columna("tipo_evento", "categoria"),
+        Columna("horas", "entero"),
+        Columna("pago_base", "dinero"),
+        Columna("propina", "dinero"),
+        Columna("transporte", "dinero"),
+        Columna("otros_costos", "dinero"),
+    ],
+    nombre_registro="EventoDJ",
+))
+
+# 03_projects/P04_redes_sociales/posts_demo.csv (P04_analizador_redes.py)
+POSTS = registrar_esquema(Esquema(
+    "posts",
+    [
+        Columna("fecha"),
+        Columna("red", "categoria"),
+        Columna("tipo", "categoria"),
+        Columna("descripcion"),
+        Columna("likes", "entero"),
+        Columna("comentarios", "entero"),
+        Columna("guardados", "entero"),
+        Columna("reproducciones", "entero", obligatoria=False),
+    ],
+    nombre_registro="Post",
+))
+
+
+# ==============================
+# Lectura
+# ==============================
+
+def leer_registros(
+    archivo: TextIO,
+    esquema: Esquema,
+    validador: Validador,
+    origen: str = "",
+    columnas: Optional[Iterable[str]] = None,
+    normalizar: Optional[Callable[[str], str]] = None,
+    fecha_desde: FechaFiltro = None,
+    fecha_hasta: FechaFiltro = None,
+    categorias: Optional[Set[str]] = None,
+    col_categoria: str = "categoria",
+) -> Iterator[Any]:
+    """
+    Recorre un CSV ya abierto (ver comun/compresion.abrir_texto) y entrega
+    un registro del esquema por cada fila válida.
+
+    Todo lo que antes repetía cada lector queda en un solo lugar:
+    - chequeo de columnas obligatorias (EncabezadoInvalido)
+    - filtros de fecha/categoría sobre el texto crudo (comun/filtros.py)
+    - conversión por lotes con cuarentena (comun/validacion.py)
+
+    El encabezado se valida al llamar la función, no al empezar a recorrer.
+    """
+    # Leemos el encabezado aparte para poder descartar líneas por fecha
+    # antes de que csv las separe en columnas
+    encabezado = next(csv.reader([archivo.readline()]), [])
+    conversor = esquema.conversor(encabezado, columnas, normalizar)
+
+    conservar = crear_predicado(
+        encabezado,
+        fecha_desde=fecha_desde,
+        fecha_hasta=fecha_hasta,
+        categorias=categorias,
+        col_categoria=col_categoria,
+        normalizar=normalizar,
+    )
+
+    lineas = prefiltrar_lineas(archivo, encabezado, fecha_desde, fecha_hasta)
+    if conservar is not None:
+        # El predicado necesita las filas cortas ya rellenadas con None
+        filas = filter(conservar, filas_crudas(csv.reader(lineas), len(encabezado)))
+    else:
+        # Sin filtros basta con saltar las filas vacías (filter en C); las
+        # filas cortas las rellena el camino lento de _convertir_por_lotes
+        filas = filter(None, csv.reader(lineas))
+
+    return _convertir_por_lotes(filas, conversor, validador, origen, len(encabezado))
+
+
+def _convertir_por_lotes(
+    filas: Iterable[List[str]],
+    conversor: Conversor,
+    validador: Validador,
+    origen: str,
+    num_columnas: int,
+    tamano_lote: int = TAMANO_LOTE_POR_DEFECTO,
+) -> Iterator[Any]:
+    """
+    Camino rápido: convierte el lote completo con conversor.convertir (una
+    llamada por fila). Si algún valor del lote es inválido (o hay filas
+    cortas: IndexError), ese lote se repite por el camino lento: las filas
+    a las que les falta alguna columna pedida se rechazan como
+    "fila_incompleta" y el resto pasa por validar_filas, que ubica las
+    filas malas y las manda al validador con su motivo.
+    """
+    iterador = iter(filas)
+    convertir = conversor.convertir
+
+    while True:
+        lote = list(islice(iterador, tamano_lote))
+        if not lote:
+            return
+
+        try:
+            registros = list(map(convertir, lote))
+        except (TypeError, ValueError, OverflowError, IndexError):
+            filas_lote = _descartar_incompletas(
+                filas_crudas(lote, num_columnas), conversor.largo_minimo, validador, origen
+            )
+            yield from starmap(
+                conversor.construir,
+                validar_filas(filas_lote, conversor.conversiones, validador, origen, tamano_lote),
+            )
+            continue
+
+        validador.aceptar(len(registros))
+        yield from registros
+
+
+def _descartar_incompletas(
+    filas: Iterable[List[Optional[str]]],
+    largo_minimo: int,
+    validador: Validador,
+    origen: str,
+) -> Iterator[List[Optional[str]]]:
+    """
+    Rechaza como "fila_incompleta" las filas (ya rellenadas con None por
+    filas_crudas) que no alcanzan a traer todas las columnas pedidas, en
+    vez de inventarles un valor. El valor anotado es cuántas celdas traía.
+    """
+    if not largo_minimo:
+        yield from filas
+        return
+
+    ultima = largo_minimo - 1
+    for fila in filas:
+        if fila[ultima] is None:
+            validador.rechazar(fila, "fila_incompleta", fila.index(None), origen)
+            continue
+        yield fila
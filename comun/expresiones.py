@@ -0,0 +1,193 @@
+import ast
+from typing import Dict, List, Mapping, Set
+
+import numpy as np
+
+try:
+    import numexpr
+except ImportError:  # numexpr es opcional: sin él se usa numpy con buffers reutilizados
+    numexpr = None
+
+"""
+comun/expresiones.py - Métricas definidas por el usuario sobre columnas
+
+Objetivo:
+- Definir métricas como texto, por ejemplo:
+    "(likes + 2*comentarios + 3*guardados) / reproducciones"
+- Parsear la expresión UNA vez (se valida que solo use columnas,
+  números, + - * / y paréntesis, y que use al menos una columna).
+- Evaluarla sobre columnas completas sin crear un arreglo temporal por
+  cada paso intermedio:
+    * con numexpr (si está instalado) la expresión se evalúa fusionada,
+      por bloques;
+    * sin numexpr se evalúa con numpy escribiendo en un buffer de salida
+      (out=) y reutilizando unos pocos buffers auxiliares.
+- División por cero segura: x / 0 da 0 (igual que porcentaje_gasto en
+  01_basics/exercises.py).
+"""
+
+_OPERADORES = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.divide,
+}
+
+_SIMBOLOS = {ast.Add: "+", ast.Sub: "-", ast.Mult: "*", ast.Div: "/"}
+
+
+class ExpresionInvalida(ValueError):
+    """La expresión usa algo que el lenguaje de métricas no permite."""
+
+
+def _validar(nodo: ast.AST, texto: str, columnas: Set[str]) -> bool:
+    """
+    Revisa el árbol y junta las columnas usadas.
+    Devuelve True si la expresión tiene alguna división.
+    """
+    if isinstance(nodo, ast.Expression):
+        return _validar(nodo.body, texto, columnas)
+    if isinstance(nodo, ast.BinOp) and type(nodo.op) in _OPERADORES:
+        izq = _validar(nodo.left, texto, columnas)
+        der = _validar(nodo.right, texto, columnas)
+        return izq or der or isinstance(nodo.op, ast.Div)
+    if isinstance(nodo, ast.UnaryOp) and isinstance(nodo.op, (ast.USub, ast.UAdd)):
+        return _validar(nodo.operand, texto, columnas)
+    if isinstance(nodo, ast.Name):
+        columnas.add(nodo.id)
+        return False
+    if isinstance(nodo, ast.Constant) and type(nodo.value) in (int, float):
+        return False
+    raise ExpresionInvalida(
+        f"Elemento no permitido en la métrica '{texto}': '{ast.unparse(nodo)}'. "
+        "Solo se aceptan columnas, números, + - * / y paréntesis."
+    )
+
+
+class ExpresionMetrica:
+    """
+    Métrica compilada. Uso típico:
+        tasa = ExpresionMetrica("(likes + comentarios) / reproducciones")
+        df["tasa"] = tasa.evaluar(df)
+    """
+
+    def __init__(self, texto: str) -> None:
+        self.texto = texto
+        try:
+            arbol = ast.parse(texto.strip(), mode="eval")
+        except SyntaxError as error:
+            raise ExpresionInvalida(f"No se pudo leer la métrica '{texto}': {error.msg}") from None
+
+        columnas: Set[str] = set()
+        self.tiene_division = _validar(arbol, texto, columnas)
+        if not columnas:
+            # Sin columnas no hay de dónde sacar el largo del resultado
+            raise ExpresionInvalida(
+                f"La métrica '{texto}' no usa ninguna columna: debe depender de al menos una."
+            )
+        self.columnas = sorted(columnas)
+        self._arbol = arbol.body
+        self._texto_numexpr = self._a_numexpr(self._arbol) if numexpr is not None else None
+
+    # ---- numexpr ----
+
+    def _a_numexpr(self, nodo: ast.AST) -> str:
+        """Traduce el árbol a texto numexpr, con división segura."""
+        if isinstance(nodo, ast.BinOp):
+            izq = self._a_numexpr(nodo.left)
+            der = self._a_numexpr(nodo.right)
+            if isinstance(nodo.op, ast.Div):
+                return f"where(({der}) != 0, ({izq}) / ({der}), 0.0)"
+            return f"({izq} {_SIMBOLOS[type(nodo.op)]} {der})"
+        if isinstance(nodo, ast.UnaryOp):
+            signo = "-" if isinstance(nodo.op, ast.USub) else "+"
+            return f"({signo}{self._a_numexpr(nodo.operand)})"
+        if isinstance(nodo, ast.Name):
+            return nodo.id
+        return repr(float(nodo.value) if self.tiene_division else nodo.value)
+
+    # ---- numpy con buffers ----
+
+    def _evaluar_en(
+        self,
+        nodo: ast.AST,
+        salida: np.ndarray,
+        datos: Dict[str, np.ndarray],
+        libres: List[np.ndarray],
+    ) -> None:
+        """Escribe el resultado de `nodo` en `salida` (sin crear arreglos nuevos)."""
+        if isinstance(nodo, ast.Name):
+            np.copyto(salida, datos[nodo.id], casting="unsafe")
+            return
+        if isinstance(nodo, ast.Constant):
+            salida.fill(nodo.value)
+            return
+        if isinstance(nodo, ast.UnaryOp):
+            self._evaluar_en(nodo.operand, salida, datos, libres)
+            if isinstance(nodo.op, ast.USub):
+                np.negative(salida, out=salida)
+            return
+
+        # BinOp: el lado izquierdo se calcula directo en `salida`
+        self._evaluar_en(nodo.left, salida, datos, libres)
+
+        # El lado derecho: si es una columna o un número se usa tal cual;
+        # si no, se calcula en un buffer auxiliar prestado
+        prestado = None
+        if isinstance(nodo.right, ast.Name):
+            derecho = datos[nodo.right.id]
+        elif isinstance(nodo.right, ast.Constant):
+            derecho = nodo.right.value
+        else:
+            prestado = libres.pop() if libres else np.empty_like(salida)
+            self._evaluar_en(nodo.right, prestado, datos, libres)
+            derecho = prestado
+
+        if isinstance(nodo.op, ast.Div):
+            # División segura: donde el divisor es 0 el resultado es 0
+            if np.ndim(derecho) == 0:
+                if derecho == 0:
+                    salida.fill(0)
+                else:
+                    np.divide(salida, derecho, out=salida)
+            else:
+                divisor_cero = derecho == 0
+                np.divide(salida, derecho, out=salida, where=~divisor_cero)
+                salida[divisor_cero] = 0
+        else:
+            _OPERADORES[type(nodo.op)](salida, derecho, out=salida)
+
+        if prestado is not None:
+            libres.append(prestado)
+
+    # ---- interfaz pública ----
+
+    def evaluar(self, columnas: Mapping[str, "np.typing.ArrayLike"]) -> np.ndarray:
+        """
+        Evalúa la métrica sobre `columnas` (un DataFrame o un dict de arreglos).
+
+        Sin divisiones y con columnas enteras el resultado es entero (así
+        "likes + comentarios + guardados" sigue dando números enteros);
+        con divisiones el resultado es float64.
+        """
+        faltantes = [c for c in self.columnas if c not in columnas]
+        if faltantes:
+            raise KeyError(
+                f"La métrica '{self.texto}' usa columnas que no existen: {', '.join(faltantes)}"
+            )
+
+        datos = {c: np.asarray(columnas[c]) for c in self.columnas}
+
+        if self._texto_numexpr is not None:
+            return numexpr.evaluate(self._texto_numexpr, local_dict=datos)
+
+        if self.tiene_division:
+            tipo = np.float64
+        else:
+            constantes = [n.value for n in ast.walk(self._arbol) if isinstance(n, ast.Constant)]
+            tipo = np.result_type(*datos.values(), *constantes)
+
+        largo = len(next(iter(datos.values())))
+        salida = np.empty(largo, dtype=tipo)
+        self._evaluar_en(self._arbol, salida, datos, [])
+        return salida
@@ -0,0 +1,195 @@
+from datetime import date
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+"""
+comun/filtros.py - Filtros y selección de columnas "empujados" al lector
+
+Objetivo:
+- Que un reporte de un solo mes o de una sola categoría no tenga que
+  convertir (int, fromisoformat, dict...) todas las filas del CSV.
+- Las filas se descartan mirando el texto crudo de la fila, ANTES de
+  cualquier conversión.
+- Solo se convierten las columnas que se pidieron.
+
+Truco para las fechas: en formato ISO (AAAA-MM-DD) el orden alfabético
+es igual al orden cronológico, así que basta comparar los primeros 10
+caracteres del texto sin convertirlo a fecha. Si además la fecha es la
+primera columna, ni siquiera hace falta que csv separe la línea.
+"""
+
+FechaFiltro = Optional[Union[str, date]]
+PredicadoFila = Callable[[List[str]], bool]
+
+
+def _fecha_texto(fecha: FechaFiltro) -> Optional[str]:
+    """Convierte una fecha (date o texto ISO) al texto AAAA-MM-DD."""
+    if fecha is None:
+        return None
+    if isinstance(fecha, date):
+        return fecha.isoformat()[:10]
+    return date.fromisoformat(fecha[:10]).isoformat()
+
+
+def indices_columnas(
+    encabezado: Sequence[str], columnas: Iterable[str]
+) -> List[Tuple[str, int]]:
+    """
+    Devuelve pares (nombre, posición) para las columnas pedidas.
+    Lanza ValueError si alguna no existe en el encabezado.
+    """
+    posiciones = {nombre: i for i, nombre in enumerate(encabezado)}
+    faltantes = [c for c in columnas if c not in posiciones]
+    if faltantes:
+        raise ValueError(
+            f"Columnas pedidas que no están en el CSV: {', '.join(faltantes)}. "
+            f"Columnas encontradas: {list(encabezado)}"
+        )
+    return [(c, posiciones[c]) for c in columnas]
+
+
+def filas_crudas(lector: Iterable[List[str]], num_columnas: int) -> Iterator[List[str]]:
+    """
+    Recorre las filas de un csv.reader igual que lo haría DictReader:
+    - se saltan las filas vacías
+    - a las filas cortas se les agrega None en las columnas faltantes
+    """
+    for fila in lector:
+        if not fila:
+            continue
+        if len(fila) < num_columnas:
+            fila = fila + [None] * (num_columnas - len(fila))
+        yield fila
+
+
+def crear_predicado(
+    encabezado: Sequence[str],
+    fecha_desde: FechaFiltro = None,
+    fecha_hasta: FechaFiltro = None,
+    categorias: Optional[Iterable[str]] = None,
+    col_fecha: str = "fecha",
+    col_categoria: str = "categoria",
+    normalizar: Optional[Callable[[str], str]] = None,
+) -> Optional[PredicadoFila]:
+    """
+    Arma una función fila_cruda -> bool que decide si la fila se conserva.
+
+    - fecha_desde / fecha_hasta: rango inclusivo (date o texto ISO).
+    - categorias: conjunto de categorías aceptadas. Si se entrega
+      `normalizar`, se compara la categoría ya normalizada (con caché,
+      así que cuesta un lookup por fila).
+
+    Devuelve None si no hay ningún filtro (el lector se ahorra la llamada).
+    """
+    desde = _fecha_texto(fecha_desde)
+    hasta = _fecha_texto(fecha_hasta)
+
+    condiciones: List[PredicadoFila] = []
+
+    if desde is not None or hasta is not None:
+        (_, i_fecha), = indices_columnas(encabezado, [col_fecha])
+        if desde is not None and hasta is not None:
+            condiciones.append(lambda f: desde <= (f[i_fecha] or "")[:10] <= hasta)
+        elif desde is not None:
+            condiciones.append(lambda f: desde <= (f[i_fecha] or "")[:10])
+        else:
+            condiciones.append(lambda f: (f[i_fecha] or "")[:10] <= hasta)
+
+    if categorias is not None:
+        (_, i_cat), = indices_columnas(encabezado, [col_categoria])
+        if normalizar is not None:
+            aceptadas: Set[str] = {normalizar(c) for c in categorias}
+            condiciones.append(lambda f: normalizar(f[i_cat] or "") in aceptadas)
+        else:
+            aceptadas = set(categorias)
+            condiciones.append(lambda f: f[i_cat] in aceptadas)
+
+    if not condiciones:
+        return None
+    if len(condiciones) == 1:
+        return condiciones[0]
+    primera, segunda = condiciones
+    return lambda f: primera(f) and segunda(f)
+
+
+def _sigue_entre_comillas(linea: str, dentro: bool) -> bool:
+    """
+    Dice si al final de `linea` queda abierto un campo entre comillas,
+    con las mismas reglas que csv.reader:
+    - una comilla solo abre un campo si es su primer carácter (inicio de
+      línea o justo después de una coma); en medio de un campo sin
+      comillas es un carácter más (ej: 5" pulgadas)
+    - dentro del campo, '""' es una comilla escapada y '"' lo cierra
+    - `dentro`: si la línea empieza ya dentro de un campo abierto
+    """
+    if '"' not in linea:
+        return dentro
+
+    inicio_campo = not dentro
+    i = 0
+    largo = len(linea)
+    while i < largo:
+        caracter = linea[i]
+        if dentro:
+            if caracter == '"':
+                if i + 1 < largo and linea[i + 1] == '"':
+                    i += 2
+                    continue
+                dentro = False
+        elif caracter == ",":
+            inicio_campo = True
+            i += 1
+            continue
+        elif caracter == '"' and inicio_campo:
+            dentro = True
+        inicio_campo = False
+        i += 1
+    return dentro
+
+
+def prefiltrar_lineas(
+    lineas: Iterable[str],
+    encabezado: Sequence[str],
+    fecha_desde: FechaFiltro = None,
+    fecha_hasta: FechaFiltro = None,
+    col_fecha: str = "fecha",
+) -> Iterable[str]:
+    """
+    Descarta líneas fuera del rango de fechas ANTES de pasarlas por csv.
+
+    Solo aplica cuando la fecha es la primera columna. Únicamente se
+    descartan registros que empiezan con algo con forma de fecha
+    (AAAA-MM-DD); cualquier otro se deja pasar y lo revisa después el
+    predicado normal.
+
+    Campos entre comillas con saltos de línea: se sigue el estado de las
+    comillas con las mismas reglas que csv (ver _sigue_entre_comillas).
+    Mientras un campo quede abierto, las líneas siguientes son
+    continuación del MISMO registro: se conservan o se descartan junto con
+    su primera línea, y nunca se evalúan como si fueran un registro nuevo.
+    """
+    desde = _fecha_texto(fecha_desde)
+    hasta = _fecha_texto(fecha_hasta)
+
+    if (desde is None and hasta is None) or not encabezado or encabezado[0] != col_fecha:
+        return lineas
+
+    desde = desde or "0000-00-00"
+    hasta = hasta or "9999-99-99"
+
+    def conservar(linea: str) -> bool:
+        prefijo = linea[:10]
+        if len(prefijo) < 10 or prefijo[4] != "-" or prefijo[7] != "-":
+            return True
+        return desde <= prefijo <= hasta
+
+    def filtrar() -> Iterator[str]:
+        dentro_de_comillas = False
+        conservar_registro = True
+        for linea in lineas:
+            if not dentro_de_comillas:
+                conservar_registro = conservar(linea)
+            dentro_de_comillas = _sigue_entre_comillas(linea, dentro_de_comillas)
+            if conservar_registro:
+                yield linea
+
+    return filtrar()
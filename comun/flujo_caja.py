@@ -0,0 +1,390 @@
+import csv
+import heapq
+import tempfile
+from dataclasses import dataclass, field
+from datetime import date
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+import numpy as np
+
+from comun.compresion import abrir_texto
+from comun.dinero import ColumnaDinero, porcentaje, sumar_tramos
+from comun.esquemas import EVENTOS_DJ, MOVIMIENTOS, Esquema, leer_registros
+from comun.formato import formato_clp
+from comun.validacion import Validador, usar_validador
+
+"""
+comun/flujo_caja.py - Motor unificado de flujo de caja
+
+Objetivo:
+- Combinar gastos (gastos_demo2.csv) e ingresos DJ (eventos_dj_demo.csv)
+  en un solo flujo ordenado por fecha.
+- Hacer un merge k-way (heapq.merge) de todas las fuentes, sin cargar
+  ningún archivo completo en memoria.
+- Si una fuente no viene ordenada, se ordena por bloques en disco
+  (ordenamiento externo) antes del merge.
+- En una sola pasada calcular:
+    * flujo neto diario
+    * saldo acumulado
+    * tasa de ahorro mensual
+- Los montos del flujo mezclado se toman por lotes en columnas int64
+  (ver comun/dinero.py) y los totales diarios se suman vectorizados:
+  la memoria queda acotada por el tamaño del lote, no del archivo.
+- Aceptar cualquier cantidad de fuentes adicionales.
+
+Uso (desde la raíz del repo):
+    python -m comun.flujo_caja
+"""
+
+
+# ==============================
+# Rutas de archivos demo
+# ==============================
+
+RUTA_BASE = Path(__file__).resolve().parents[1]
+
+RUTA_GASTOS = RUTA_BASE / "03_projects" / "P03_finanzas_personales" / "gastos_demo2.csv"
+RUTA_EVENTOS = RUTA_BASE / "02_data" / "eventos_dj_demo.csv"
+
+# Filas por bloque al ordenar fuentes desordenadas en disco
+TAMANO_BLOQUE_POR_DEFECTO = 100_000
+
+# Movimientos que se agrupan por día juntos (columnas numpy por lote)
+TAMANO_LOTE_DIARIO = 4096
+
+
+# ==============================
+# Modelos de datos
+# ==============================
+
+class MovimientoCaja(NamedTuple):
+    """
+    Un movimiento de dinero: monto > 0 es ingreso, monto < 0 es gasto.
+    Montos en pesos enteros (ver comun/dinero.py).
+    """
+    fecha: date
+    monto: int
+    origen: str
+
+
+@dataclass
+class Fuente:
+    """
+    Una fuente de movimientos para el motor.
+
+    filas: cualquier iterable de MovimientoCaja (idealmente un generador).
+    ordenada: True si ya viene ordenada por fecha. Si es False se aplica
+              ordenamiento externo antes del merge.
+    """
+    nombre: str
+    filas: Iterable[MovimientoCaja]
+    ordenada: bool = True
+
+
+@dataclass
+class FlujoDiario:
+    fecha: date
+    ingresos: int
+    gastos: int
+    neto: int
+    saldo: int
+
+
+@dataclass
+class FlujoMensual:
+    mes: str
+    ingresos: int = 0
+    gastos: int = 0
+
+    @property
+    def neto(self) -> int:
+        return self.ingresos - self.gastos
+
+    @property
+    def tasa_ahorro(self) -> Optional[float]:
+        """
+        Porcentaje del ingreso que se ahorró en el mes. None si no hubo
+        ingresos: con gastos y sin ingresos no hay tasa que mostrar (un 0%
+        parecería que el mes quedó en equilibrio).
+        """
+        if self.ingresos == 0:
+            return None
+        return porcentaje(self.neto, self.ingresos)
+
+
+@dataclass
+class ResumenFlujoCaja:
+    saldo_inicial: int
+    saldo_final: int
+    dias: List[FlujoDiario] = field(default_factory=list)
+    meses: Dict[str, FlujoMensual] = field(default_factory=dict)
+
+
+# ==============================
+# Lectores en streaming
+# ==============================
+
+def _leer_columnas(
+    ruta_csv: Path,
+    esquema: Esquema,
+    columnas: List[str],
+    validador: Optional[Validador] = None,
+) -> Iterator[tuple]:
+    """
+    Recorre un CSV fila a fila con el conversor del esquema, convirtiendo
+    solo las columnas pedidas. Las filas inválidas se omiten y se cuentan
+    en `validador` (sin validador se imprime un resumen si hubo errores):
+    un saldo calculado sin algunas filas no puede quedar mal en silencio.
+    """
+    if not ruta_csv.exists():
+        raise FileNotFoundError(f"No se encontró el archivo CSV: {ruta_csv}")
+
+    with abrir_texto(ruta_csv) as f, usar_validador(validador) as v:
+        yield from leer_registros(f, esquema, v, origen=ruta_csv.name, columnas=columnas)
+
+
+def iterar_gastos(
+    ruta_csv: Path, origen: str = "gastos", validador: Optional[Validador] = None
+) -> Iterator[MovimientoCaja]:
+    """
+    Recorre un CSV fecha,categoria,monto,detalle y entrega cada gasto
+    como un MovimientoCaja con monto negativo. Filas inválidas se omiten
+    y se cuentan en `validador`.
+    """
+    for mov in _leer_columnas(ruta_csv, MOVIMIENTOS, ["fecha", "monto"], validador):
+        yield MovimientoCaja(mov.fecha.date(), -mov.monto, origen)
+
+
+def iterar_eventos(
+    ruta_csv: Path, origen: str = "eventos_dj", validador: Optional[Validador] = None
+) -> Iterator[MovimientoCaja]:
+    """
+    Recorre un CSV de eventos DJ y entrega el ingreso neto de cada evento
+    (pago_base + propina - transporte - otros_costos). Filas inválidas se
+    omiten y se cuentan en `validador`.
+    """
+    columnas = ["fecha", "pago_base", "propina", "transporte", "otros_costos"]
+    for e in _leer_columnas(ruta_csv, EVENTOS_DJ, columnas, validador):
+        neto = e.pago_base + e.propina - e.transporte - e.otros_costos
+        yield MovimientoCaja(e.fecha, neto, origen)
+
+
+# ==============================
+# Ordenamiento externo
+# ==============================
+
+def _leer_bloque(ruta: Path) -> Iterator[MovimientoCaja]:
+    with ruta.open(encoding="utf-8", newline="") as f:
+        for fecha, monto, origen in csv.reader(f):
+            yield MovimientoCaja(date.fromisoformat(fecha), int(monto), origen)
+
+
+def ordenar_externo(
+    filas: Iterable[MovimientoCaja],
+    tamano_bloque: int = TAMANO_BLOQUE_POR_DEFECTO,
+    carpeta_temporal: Optional[Path] = None,
+) -> Iterator[MovimientoCaja]:
+    """
+    Ordena por fecha un flujo de cualquier tamaño usando memoria acotada:
+    1. Corta el flujo en bloques de `tamano_bloque` filas.
+    2. Ordena cada bloque en memoria y lo guarda en un CSV temporal.
+    3. Mezcla todos los bloques con heapq.merge.
+
+    Si todo cabe en un solo bloque, no se toca el disco.
+    """
+    if tamano_bloque <= 0:
+        raise ValueError("tamano_bloque debe ser mayor que 0.")
+
+    iterador = iter(filas)
+    primer_bloque = sorted(islice(iterador, tamano_bloque))
+    segundo_bloque = sorted(islice(iterador, tamano_bloque))
+
+    if not segundo_bloque:
+        yield from primer_bloque
+        return
+
+    with tempfile.TemporaryDirectory(dir=carpeta_temporal) as carpeta:
+        rutas: List[Path] = []
+        bloque = primer_bloque
+
+        while bloque:
+            ruta = Path(carpeta) / f"bloque_{len(rutas)}.csv"
+            with ruta.open("w", encoding="utf-8", newline="") as f:
+                escritor = csv.writer(f)
+                escritor.writerows(
+                    (m.fecha.isoformat(), m.monto, m.origen) for m in bloque
+                )
+            rutas.append(ruta)
+
+            if segundo_bloque:
+                bloque, segundo_bloque = segundo_bloque, []
+            else:
+                bloque = sorted(islice(iterador, tamano_bloque))
+
+        yield from heapq.merge(*(_leer_bloque(r) for r in rutas), key=lambda m: m.fecha)
+
+
+def _verificar_orden(fuente: Fuente) -> Iterator[MovimientoCaja]:
+    """Avisa con un error si una fuente marcada como ordenada no lo está."""
+    anterior: Optional[date] = None
+    for mov in fuente.filas:
+        if anterior is not None and mov.fecha < anterior:
+            raise ValueError(
+                f"La fuente '{fuente.nombre}' no está ordenada por fecha "
+                f"({mov.fecha} después de {anterior}). Usa ordenada=False."
+            )
+        anterior = mov.fecha
+        yield mov
+
+
+# ==============================
+# Motor de flujo de caja
+# ==============================
+
+def mezclar_fuentes(
+    fuentes: Iterable[Fuente], tamano_bloque: int = TAMANO_BLOQUE_POR_DEFECTO
+) -> Iterator[MovimientoCaja]:
+    """Merge k-way por fecha de todas las fuentes (ordenando las que lo necesiten)."""
+    flujos = [
+        _verificar_orden(f) if f.ordenada else ordenar_externo(f.filas, tamano_bloque)
+        for f in fuentes
+    ]
+    return heapq.merge(*flujos, key=lambda m: m.fecha)
+
+
+def flujo_diario(
+    movimientos: Iterable[MovimientoCaja],
+    saldo_inicial: int = 0,
+    tamano_lote: int = TAMANO_LOTE_DIARIO,
+) -> Iterator[FlujoDiario]:
+    """
+    Agrupa un flujo YA ordenado por fecha en totales diarios con saldo
+    acumulado. Solo guarda en memoria un lote de movimientos.
+
+    Por cada lote: fechas (como ordinal) y montos pasan a columnas int64,
+    se ubica dónde cambia el día y los ingresos / gastos de cada tramo se
+    suman vectorizados (sumar_tramos, con control de desborde). El último
+    día del lote puede seguir en el lote siguiente: queda pendiente.
+    """
+    iterador = iter(movimientos)
+    saldo = saldo_inicial
+    # Día en curso (puede cruzar lotes): [fecha, ingresos, gastos]
+    pendiente: Optional[list] = None
+
+    while True:
+        lote = list(islice(iterador, tamano_lote))
+        if not lote:
+            break
+
+        fechas, montos, _ = zip(*lote)
+        dias = np.fromiter(map(date.toordinal, fechas), dtype=np.int64, count=len(lote))
+        valores = ColumnaDinero(montos).valores
+
+        cambia = np.empty(len(dias), dtype=bool)
+        cambia[:1] = True
+        np.not_equal(dias[1:], dias[:-1], out=cambia[1:])
+        inicios = np.flatnonzero(cambia)
+
+        ingresos = sumar_tramos(np.where(valores >= 0, valores, 0), inicios).tolist()
+        gastos = sumar_tramos(np.where(valores < 0, -valores, 0), inicios).tolist()
+
+        for k, i in enumerate(inicios.tolist()):
+            if pendiente is not None:
+                if fechas[i] == pendiente[0]:
+                    pendiente[1] += ingresos[k]
+                    pendiente[2] += gastos[k]
+                    continue
+                fecha, ingreso, gasto = pendiente
+                saldo += ingreso - gasto
+                yield FlujoDiario(fecha, ingreso, gasto, ingreso - gasto, saldo)
+            pendiente = [fechas[i], ingresos[k], gastos[k]]
+
+    if pendiente is not None:
+        fecha, ingreso, gasto = pendiente
+        saldo += ingreso - gasto
+        yield FlujoDiario(fecha, ingreso, gasto, ingreso - gasto, saldo)
+
+
+def calcular_flujo_caja(
+    fuentes: Iterable[Fuente],
+    saldo_inicial: int = 0,
+    guardar_dias: bool = True,
+    tamano_bloque: int = TAMANO_BLOQUE_POR_DEFECTO,
+) -> ResumenFlujoCaja:
+    """
+    Recorre todas las fuentes una sola vez y devuelve el resumen de caja.
+
+    Con guardar_dias=False solo se conservan los totales mensuales
+    (memoria acotada por número de meses, no por número de filas).
+    """
+    resumen = ResumenFlujoCaja(saldo_inicial=saldo_inicial, saldo_final=saldo_inicial)
+
+    for dia in flujo_diario(mezclar_fuentes(fuentes, tamano_bloque), saldo_inicial):
+        mes = dia.fecha.strftime("%Y-%m")
+        mensual = resumen.meses.get(mes)
+        if mensual is None:
+            mensual = resumen.meses[mes] = FlujoMensual(mes)
+        mensual.ingresos += dia.ingresos
+        mensual.gastos += dia.gastos
+
+        resumen.saldo_final = dia.saldo
+        if guardar_dias:
+            resumen.dias.append(dia)
+
+    return resumen
+
+
+# ==============================
+# Reporte
+# ==============================
+
+def generar_texto_reporte(resumen: ResumenFlujoCaja) -> str:
+    lineas: List[str] = []
+
+    lineas.append("FLUJO DE CAJA (GASTOS + INGRESOS DJ)")
+    lineas.append("=" * 60)
+    lineas.append(f"Saldo inicial: {formato_clp(resumen.saldo_inicial)}")
+    lineas.append(f"Saldo final:   {formato_clp(resumen.saldo_final)}")
+    lineas.append("-" * 60)
+
+    if resumen.dias:
+        lineas.append("")
+        lineas.append("Flujo diario:")
+        for d in resumen.dias:
+            lineas.append(
+                f"  {d.fecha}  neto {formato_clp(d.neto):>12}  "
+                f"saldo {formato_clp(d.saldo):>12}"
+            )
+
+    lineas.append("")
+    lineas.append("Resumen mensual:")
+    for mes, m in resumen.meses.items():
+        # Sin ingresos en el mes la tasa de ahorro no está definida
+        tasa = "    n/a" if m.tasa_ahorro is None else f"{m.tasa_ahorro:6.1f}%"
+        lineas.append(
+            f"  {mes}  ingresos {formato_clp(m.ingresos):>12}  "
+            f"gastos {formato_clp(m.gastos):>12}  ahorro {tasa}"
+        )
+
+    lineas.append("=" * 60)
+
+    return "\n".join(lineas)
+
+
+def main() -> None:
+    # Un solo validador para todas las fuentes: un único resumen al final
+    with Validador() as validador:
+        fuentes = [
+            Fuente("gastos", iterar_gastos(RUTA_GASTOS, validador=validador)),
+            Fuente("eventos_dj", iterar_eventos(RUTA_EVENTOS, validador=validador)),
+        ]
+        resumen = calcular_flujo_caja(fuentes)
+
+    print(generar_texto_reporte(resumen))
+    print(validador.resumen())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+"""
+comun/formato.py - Formatos de salida compartidos por los reportes
+"""
+
+
+def formato_clp(monto: float) -> str:
+    """
+    Formatea un número como CLP: 12345.6 -> $12.346
+
+    Los enteros (montos en unidades menores de comun.dinero) se formatean
+    sin pasar por float, así no se pierde precisión en montos enormes.
+    """
+    if isinstance(monto, int):
+        return f"${monto:,}".replace(",", ".")
+    return f"${monto:,.0f}".replace(",", ".")
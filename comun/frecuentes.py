@@ -0,0 +1,189 @@
+import heapq
+from typing import Any, Dict, Hashable, Iterable, List, NamedTuple, Optional
+
+"""
+comun/frecuentes.py - Top-K aproximado con memoria fija (Space-Saving)
+
+Objetivo:
+- Encontrar los "detalle" más frecuentes o con más gasto (y las
+  "descripcion" de posts con más engagement) cuando hay millones de
+  textos distintos y un Counter exacto no cabe en memoria.
+- Usar siempre como máximo `capacidad` contadores.
+- Dar una cota de error para cada resultado.
+- Poder combinar sketches de distintos bloques o máquinas (merge).
+
+Algoritmo Space-Saving (Metwally et al.):
+- Si la clave ya tiene contador, se le suma el peso.
+- Si hay espacio, se crea un contador nuevo.
+- Si no, se reemplaza la clave con el contador MÁS BAJO: la nueva
+  hereda ese valor (como error) y le suma su peso.
+
+Garantías (N = suma de todos los pesos):
+- estimado - error <= valor real <= estimado
+- error <= N / capacidad
+- toda clave con valor real > N / capacidad aparece en el sketch
+"""
+
+# Contadores por defecto (memoria fija, independiente del número de filas)
+CAPACIDAD_POR_DEFECTO = 1000
+
+
+class Frecuente(NamedTuple):
+    clave: Hashable
+    estimado: float
+    error: float
+
+    @property
+    def minimo(self) -> float:
+        """Valor real garantizado como mínimo."""
+        return self.estimado - self.error
+
+
+class TopKAproximado:
+    """
+    Sketch Space-Saving. Uso típico:
+        top = TopKAproximado(capacidad=1000)
+        for m in movimientos:
+            top.agregar(m.detalle, m.monto)
+        top.top(5)
+    """
+
+    def __init__(self, capacidad: int = CAPACIDAD_POR_DEFECTO) -> None:
+        if capacidad <= 0:
+            raise ValueError("capacidad debe ser mayor que 0.")
+        self.capacidad = capacidad
+        self.total = 0
+
+        # clave -> [estimado, error]
+        self._contadores: Dict[Hashable, List[float]] = {}
+
+        # Heap (estimado, orden, clave) para encontrar el mínimo rápido.
+        # Las entradas viejas se descartan al sacarlas ("lazy deletion").
+        self._heap: List[tuple] = []
+        self._orden = 0
+
+    # ---- actualización ----
+
+    def _empujar(self, clave: Hashable, estimado: float) -> None:
+        self._orden += 1
+        heapq.heappush(self._heap, (estimado, self._orden, clave))
+        if len(self._heap) > 4 * self.capacidad:
+            self._reconstruir_heap()
+
+    def _reconstruir_heap(self) -> None:
+        self._heap = [
+            (c[0], i, clave) for i, (clave, c) in enumerate(self._contadores.items())
+        ]
+        self._orden = len(self._heap)
+        heapq.heapify(self._heap)
+
+    def _sacar_minimo(self) -> Hashable:
+        """Saca del heap la clave con el contador más bajo (vigente)."""
+        while True:
+            estimado, _, clave = heapq.heappop(self._heap)
+            contador = self._contadores.get(clave)
+            if contador is not None and contador[0] == estimado:
+                return clave
+
+    def agregar(self, clave: Hashable, peso: float = 1) -> None:
+        """Suma `peso` (>= 0) a `clave`."""
+        if peso < 0:
+            raise ValueError("Space-Saving solo admite pesos no negativos.")
+        self.total += peso
+
+        contador = self._contadores.get(clave)
+        if contador is not None:
+            contador[0] += peso
+        elif len(self._contadores) < self.capacidad:
+            contador = self._contadores[clave] = [peso, 0]
+        else:
+            reemplazada = self._sacar_minimo()
+            minimo = self._contadores.pop(reemplazada)[0]
+            contador = self._contadores[clave] = [minimo + peso, minimo]
+
+        self._empujar(clave, contador[0])
+
+    def agregar_muchos(
+        self, claves: Iterable[Hashable], pesos: Optional[Iterable[float]] = None
+    ) -> None:
+        """Agrega una columna completa de claves (y pesos, si se entregan)."""
+        if pesos is None:
+            for clave in claves:
+                self.agregar(clave)
+        else:
+            for clave, peso in zip(claves, pesos):
+                self.agregar(clave, peso)
+
+    # ---- consulta ----
+
+    @property
+    def minimo(self) -> float:
+        """Contador más bajo; 0 si todavía hay espacio libre."""
+        if len(self._contadores) < self.capacidad:
+            return 0
+        return min(c[0] for c in self._contadores.values())
+
+    @property
+    def cota_error(self) -> float:
+        """Error máximo de cualquier estimado: N / capacidad."""
+        return self.total / self.capacidad
+
+    def top(self, n: int = 10) -> List[Frecuente]:
+        """Las n claves con mayor estimado (con su error)."""
+        mejores = heapq.nlargest(n, self._contadores.items(), key=lambda kv: kv[1][0])
+        return [Frecuente(clave, c[0], c[1]) for clave, c in mejores]
+
+    def __len__(self) -> int:
+        return len(self._contadores)
+
+    # ---- merge ----
+
+    def combinar(self, otro: "TopKAproximado") -> "TopKAproximado":
+        """
+        Junta dos sketches (de bloques o máquinas distintas) en uno nuevo.
+
+        Una clave que falta en un sketch lleno pudo tener ahí hasta su
+        contador mínimo: se suma ese mínimo al estimado y al error, así
+        las garantías se mantienen.
+        """
+        resultado = TopKAproximado(max(self.capacidad, otro.capacidad))
+        resultado.total = self.total + otro.total
+
+        min_a, min_b = self.minimo, otro.minimo
+        combinados: Dict[Hashable, List[float]] = {}
+
+        for clave, (est, err) in self._contadores.items():
+            est_b, err_b = otro._contadores.get(clave, (min_b, min_b))
+            combinados[clave] = [est + est_b, err + err_b]
+        for clave, (est, err) in otro._contadores.items():
+            if clave not in combinados:
+                combinados[clave] = [est + min_a, err + min_a]
+
+        mejores = heapq.nlargest(
+            resultado.capacidad, combinados.items(), key=lambda kv: kv[1][0]
+        )
+        resultado._contadores = dict(mejores)
+        resultado._reconstruir_heap()
+        return resultado
+
+    # ---- serialización (ver comun/parciales.py) ----
+
+    def a_dict(self) -> Dict[str, Any]:
+        return {
+            "capacidad": self.capacidad,
+            "total": self.total,
+            "claves": list(self._contadores),
+            "estimados": [c[0] for c in self._contadores.values()],
+            "errores": [c[1] for c in self._contadores.values()],
+        }
+
+    @classmethod
+    def desde_dict(cls, datos: Dict[str, Any]) -> "TopKAproximado":
+        sketch = cls(datos["capacidad"])
+        sketch.total = datos["total"]
+        sketch._contadores = {
+            clave: [est, err]
+            for clave, est, err in zip(datos["claves"], datos["estimados"], datos["errores"])
+        }
+        sketch._reconstruir_heap()
+        return sketch
@@ -0,0 +1,187 @@
+import struct
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+"""
+comun/parciales.py - Formato binario para resultados parciales
+
+Objetivo:
+- Repartir un año de datos en varias máquinas (shards) y combinar los
+  resultados después.
+- Cada analizador guarda un "parcial": sumas, conteos, mín/máx, la fila
+  del máximo, sketches... todo lo necesario para:
+    * map:      shard (CSV)        -> parcial
+    * merge:    varios parciales   -> un parcial
+    * finalize: parcial            -> reporte
+- El formato es compacto, binario y versionado.
+
+Estructura del archivo:
+    MAGIC (4 bytes) | versión (1 byte) | tipo (texto) | valor
+
+donde "valor" es normalmente un diccionario. Cada valor se escribe con
+una etiqueta de 1 byte seguida de su contenido:
+    N None | T/F bool | i int (8 bytes) | I int grande (texto)
+    f float (8 bytes) | s texto | d date | t datetime
+    l lista | m diccionario
+"""
+
+MAGIC = b"FDAP"
+VERSION = 1
+
+_ENTERO = struct.Struct("<q")
+_DECIMAL = struct.Struct("<d")
+_LARGO = struct.Struct("<I")
+
+_MIN_INT64 = -(1 << 63)
+_MAX_INT64 = (1 << 63) - 1
+
+
+class FormatoParcialError(ValueError):
+    """El archivo no es un parcial válido (o es de otra versión/tipo)."""
+
+
+# ==============================
+# Escritura
+# ==============================
+
+def _escribir_texto(salida: BinaryIO, texto: str) -> None:
+    datos = texto.encode("utf-8")
+    salida.write(_LARGO.pack(len(datos)))
+    salida.write(datos)
+
+
+def _escribir_valor(salida: BinaryIO, valor: Any) -> None:
+    if valor is None:
+        salida.write(b"N")
+    elif isinstance(valor, bool):
+        salida.write(b"T" if valor else b"F")
+    elif isinstance(valor, int):
+        if _MIN_INT64 <= valor <= _MAX_INT64:
+            salida.write(b"i")
+            salida.write(_ENTERO.pack(valor))
+        else:
+            salida.write(b"I")
+            _escribir_texto(salida, str(valor))
+    elif isinstance(valor, float):
+        salida.write(b"f")
+        salida.write(_DECIMAL.pack(valor))
+    elif isinstance(valor, str):
+        salida.write(b"s")
+        _escribir_texto(salida, valor)
+    elif isinstance(valor, datetime):
+        salida.write(b"t")
+        _escribir_texto(salida, valor.isoformat())
+    elif isinstance(valor, date):
+        salida.write(b"d")
+        _escribir_texto(salida, valor.isoformat())
+    elif isinstance(valor, (list, tuple)):
+        salida.write(b"l")
+        salida.write(_LARGO.pack(len(valor)))
+        for item in valor:
+            _escribir_valor(salida, item)
+    elif isinstance(valor, dict):
+        salida.write(b"m")
+        salida.write(_LARGO.pack(len(valor)))
+        for clave, item in valor.items():
+            _escribir_valor(salida, clave)
+            _escribir_valor(salida, item)
+    else:
+        raise TypeError(f"No se puede guardar en un parcial: {type(valor).__name__}")
+
+
+def guardar_parcial(ruta: Path, tipo: str, datos: Dict[str, Any]) -> None:
+    """Escribe un parcial de `tipo` (ej: "movimientos") en `ruta`."""
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    with ruta.open("wb") as salida:
+        salida.write(MAGIC)
+        salida.write(bytes([VERSION]))
+        _escribir_texto(salida, tipo)
+        _escribir_valor(salida, datos)
+
+
+# ==============================
+# Lectura
+# ==============================
+
+class _Lector:
+    def __init__(self, datos: bytes) -> None:
+        self.datos = datos
+        self.pos = 0
+
+    def leer(self, n: int) -> bytes:
+        if self.pos + n > len(self.datos):
+            raise FormatoParcialError("El parcial está truncado.")
+        trozo = self.datos[self.pos:self.pos + n]
+        self.pos += n
+        return trozo
+
+    def texto(self) -> str:
+        (largo,) = _LARGO.unpack(self.leer(_LARGO.size))
+        return self.leer(largo).decode("utf-8")
+
+    def valor(self) -> Any:
+        etiqueta = self.leer(1)
+        if etiqueta == b"N":
+            return None
+        if etiqueta == b"T":
+            return True
+        if etiqueta == b"F":
+            return False
+        if etiqueta == b"i":
+            return _ENTERO.unpack(self.leer(_ENTERO.size))[0]
+        if etiqueta == b"I":
+            return int(self.texto())
+        if etiqueta == b"f":
+            return _DECIMAL.unpack(self.leer(_DECIMAL.size))[0]
+        if etiqueta == b"s":
+            return self.texto()
+        if etiqueta == b"t":
+            return datetime.fromisoformat(self.texto())
+        if etiqueta == b"d":
+            return date.fromisoformat(self.texto())
+        if etiqueta == b"l":
+            (largo,) = _LARGO.unpack(self.leer(_LARGO.size))
+            return [self.valor() for _ in range(largo)]
+        if etiqueta == b"m":
+            (largo,) = _LARGO.unpack(self.leer(_LARGO.size))
+            resultado = {}
+            for _ in range(largo):
+                clave = self.valor()
+                resultado[clave] = self.valor()
+            return resultado
+        raise FormatoParcialError(f"Etiqueta desconocida en el parcial: {etiqueta!r}")
+
+
+def cargar_parcial(
+    ruta: Path, tipo_esperado: Optional[str] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Lee un parcial y devuelve (tipo, datos).
+    Si se entrega `tipo_esperado`, valida que coincida.
+    """
+    if not ruta.exists():
+        raise FileNotFoundError(f"No se encontró el parcial: {ruta}")
+
+    lector = _Lector(ruta.read_bytes())
+
+    if lector.leer(len(MAGIC)) != MAGIC:
+        raise FormatoParcialError(f"{ruta} no es un archivo de parcial.")
+
+    version = lector.leer(1)[0]
+    if version != VERSION:
+        raise FormatoParcialError(
+            f"{ruta} usa la versión {version} del formato (se esperaba {VERSION})."
+        )
+
+    tipo = lector.texto()
+    if tipo_esperado is not None and tipo != tipo_esperado:
+        raise FormatoParcialError(
+            f"{ruta} es un parcial de '{tipo}', se esperaba '{tipo_esperado}'."
+        )
+
+    datos = lector.valor()
+    if lector.pos != len(lector.datos):
+        raise FormatoParcialError(f"{ruta} tiene datos sobrantes al final.")
+
+    return tipo, datos
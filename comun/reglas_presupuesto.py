@@ -0,0 +1,361 @@
+import json
+import operator
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from comun.dinero import ColumnaDinero, agregar_por_grupo
+from comun.formato import formato_clp
+
+try:
+    import yaml
+except ImportError:  # PyYAML es opcional: sin él solo se aceptan reglas en JSON
+    yaml = None
+
+"""
+comun/reglas_presupuesto.py - Motor de reglas de presupuesto
+
+Objetivo:
+- Definir presupuestos y alertas en un archivo (JSON o YAML), por ejemplo:
+    * "comida > 150.000 en cualquier mes"
+    * "transporte > 10% del gasto del mes"
+- Compilar las reglas UNA vez y evaluarlas todas juntas.
+- Recorrer los movimientos UNA sola vez, sin importar cuántas reglas haya:
+  las columnas (mes, categoría, monto) se agrupan por (mes, categoría)
+  con numpy (tabla_desde_columnas) y luego cada regla solo mira esa
+  tabla pequeña (meses x categorías), no las filas.
+- Cada regla se evalúa como una máscara: una comparación vectorizada
+  sobre los valores de su categoría en todos los meses a la vez.
+
+Formato del archivo:
+    {
+      "reglas": [
+        {"nombre": "Comida sobre presupuesto", "categoria": "comida",
+         "metrica": "total", "operador": ">", "limite": 150000},
+        {"nombre": "Mucho transporte", "categoria": "transporte",
+         "metrica": "participacion", "operador": ">", "limite": 10}
+      ]
+    }
+
+Métricas disponibles (siempre por mes y categoría):
+- total: suma de montos
+- participacion: % del gasto total del mes
+- conteo: número de movimientos
+- maximo: movimiento individual más alto
+- promedio: monto promedio por movimiento
+
+Para varias máquinas (ver comun/parciales.py) cada shard guarda su tabla
+por (mes, categoría) armada con tabla_desde_columnas, las tablas se suman
+con combinar_tablas y las reglas se evalúan al final con evaluar_tabla:
+el resultado es el mismo que evaluando todas las filas juntas (evaluar
+hace exactamente eso: tabla_desde_columnas + evaluar_tabla).
+"""
+
+
+# ==============================
+# Modelos de datos
+# ==============================
+
+# Sirven igual para números y para arreglos numpy (comparan elemento a elemento)
+OPERADORES: Dict[str, Callable[[Any, float], Any]] = {
+    ">": operator.gt,
+    ">=": operator.ge,
+    "<": operator.lt,
+    "<=": operator.le,
+}
+
+METRICAS = ("total", "participacion", "conteo", "maximo", "promedio")
+
+# (mes AAAAMM, categoría) -> [total, conteo, máximo]
+TablaMensual = Dict[Tuple[int, str], List[int]]
+
+
+@dataclass
+class Regla:
+    nombre: str
+    categoria: str
+    metrica: str
+    operador: str
+    limite: float
+
+
+@dataclass
+class Alerta:
+    regla: Regla
+    mes: str
+    valor: float
+
+    def texto(self) -> str:
+        """Descripción legible, con montos en CLP."""
+        if self.regla.metrica == "participacion":
+            valor = f"{self.valor:.1f}%"
+            limite = f"{self.regla.limite:.1f}%"
+        elif self.regla.metrica == "conteo":
+            valor = f"{self.valor:.0f}"
+            limite = f"{self.regla.limite:.0f}"
+        else:
+            valor = formato_clp(self.valor)
+            limite = formato_clp(self.regla.limite)
+        return (
+            f"[{self.mes}] {self.regla.nombre}: {self.regla.categoria} "
+            f"{self.regla.metrica} = {valor} ({self.regla.operador} {limite})"
+        )
+
+
+# ==============================
+# Lectura del archivo de reglas
+# ==============================
+
+def _crear_regla(datos: dict, posicion: int) -> Regla:
+    faltantes = {"categoria", "metrica", "operador", "limite"} - set(datos)
+    if faltantes:
+        raise ValueError(
+            f"Regla #{posicion}: faltan los campos {', '.join(sorted(faltantes))}."
+        )
+    if datos["metrica"] not in METRICAS:
+        raise ValueError(
+            f"Regla #{posicion}: métrica desconocida '{datos['metrica']}'. "
+            f"Opciones: {', '.join(METRICAS)}"
+        )
+    if datos["operador"] not in OPERADORES:
+        raise ValueError(
+            f"Regla #{posicion}: operador desconocido '{datos['operador']}'. "
+            f"Opciones: {', '.join(OPERADORES)}"
+        )
+
+    return Regla(
+        nombre=datos.get("nombre", f"regla {posicion}"),
+        categoria=str(datos["categoria"]),
+        metrica=datos["metrica"],
+        operador=datos["operador"],
+        limite=float(datos["limite"]),
+    )
+
+
+def cargar_reglas(ruta_reglas: Path) -> List[Regla]:
+    """Lee reglas desde un archivo .json o .yaml/.yml."""
+    if not ruta_reglas.exists():
+        raise FileNotFoundError(f"No se encontró el archivo de reglas: {ruta_reglas}")
+
+    texto = ruta_reglas.read_text(encoding="utf-8")
+
+    if ruta_reglas.suffix.lower() in (".yaml", ".yml"):
+        if yaml is None:
+            raise ImportError(
+                "Para leer reglas en YAML hay que instalar PyYAML (pip install pyyaml)."
+            )
+        datos = yaml.safe_load(texto)
+    else:
+        datos = json.loads(texto)
+
+    if not isinstance(datos, dict) or not isinstance(datos.get("reglas"), list):
+        raise ValueError("El archivo de reglas debe tener una lista 'reglas'.")
+
+    return [_crear_regla(r, i) for i, r in enumerate(datos["reglas"], start=1)]
+
+
+# ==============================
+# Columnas de entrada
+# ==============================
+
+def columnas_desde_movimientos(
+    movimientos: Sequence,
+) -> Tuple[np.ndarray, List[str], ColumnaDinero]:
+    """
+    Pasa una lista de Movimiento (o cualquier objeto con fecha, categoria
+    y monto) a tres columnas: mes (AAAAMM), categoría y monto.
+    Mes va en un arreglo numpy int64 y monto en una ColumnaDinero (pesos
+    enteros en int64, ver comun/dinero.py): 8 bytes por fila cada uno.
+    """
+    meses = np.array([m.fecha.year * 100 + m.fecha.month for m in movimientos], dtype=np.int64)
+    categorias = [m.categoria for m in movimientos]
+    montos = ColumnaDinero([m.monto for m in movimientos])
+    return meses, categorias, montos
+
+
+def codificar(valores: Sequence[str]) -> Tuple[np.ndarray, List[str]]:
+    """
+    Códigos enteros para agrupar con numpy: retorna (código de cada fila,
+    valores distintos en orden de aparición). El código de una fila es la
+    posición de su valor en esa lista.
+    """
+    distintos = list(dict.fromkeys(valores))
+    codigo_de = {valor: i for i, valor in enumerate(distintos)}
+    codigos = np.fromiter(map(codigo_de.__getitem__, valores), dtype=np.int64, count=len(valores))
+    return codigos, distintos
+
+
+# ==============================
+# Tabla por (mes, categoría)
+# ==============================
+
+def tabla_desde_columnas(
+    meses: Sequence[int], categorias: Sequence[str], montos: Sequence[int]
+) -> TablaMensual:
+    """
+    Agrupa las columnas por (mes, categoría) en una sola pasada vectorizada:
+    cada fila recibe una clave entera mes * num_categorias + código de su
+    categoría y agregar_por_grupo (comun/dinero.py) calcula total exacto,
+    conteo y máximo de cada clave.
+    """
+    codigos, nombres = codificar(categorias)
+    valores = montos.valores if isinstance(montos, ColumnaDinero) else np.asarray(
+        montos, dtype=np.int64
+    )
+    claves = np.asarray(meses, dtype=np.int64) * len(nombres) + codigos
+
+    grupos, totales, conteos, maximos = agregar_por_grupo(claves, valores)
+
+    tabla: TablaMensual = {}
+    for clave, suma, cantidad, mayor in zip(
+        grupos.tolist(), totales.tolist(), conteos.tolist(), maximos.tolist()
+    ):
+        mes, codigo = divmod(clave, len(nombres))
+        tabla[(mes, nombres[codigo])] = [suma, cantidad, mayor]
+    return tabla
+
+
+def combinar_tablas(tablas: Iterable[TablaMensual]) -> TablaMensual:
+    """Junta tablas de varios shards: suma totales y conteos, máximo de máximos."""
+    resultado: TablaMensual = {}
+    for tabla in tablas:
+        for clave, (suma, cantidad, maximo) in tabla.items():
+            celda = resultado.get(clave)
+            if celda is None:
+                resultado[clave] = [suma, cantidad, maximo]
+                continue
+            celda[0] += suma
+            celda[1] += cantidad
+            if maximo > celda[2]:
+                celda[2] = maximo
+    return resultado
+
+
+# ==============================
+# Motor compilado
+# ==============================
+
+class MotorReglas:
+    """
+    Reglas compiladas, listas para evaluarse sobre columnas de movimientos.
+
+    Al compilar:
+    - se normaliza la categoría de cada regla (si se entrega `normalizar`)
+    - se resuelve el operador a una función
+    - se agrupan las reglas por categoría, para que cada categoría arme
+      sus métricas una sola vez y todas sus reglas las compartan
+    """
+
+    def __init__(
+        self, reglas: Sequence[Regla], normalizar: Optional[Callable[[str], str]] = None
+    ) -> None:
+        self.reglas = list(reglas)
+        self._normalizar = normalizar
+
+        self._por_categoria: Dict[str, List[Tuple[Regla, str, Callable]]] = defaultdict(list)
+        for regla in self.reglas:
+            categoria = normalizar(regla.categoria) if normalizar else regla.categoria
+            self._por_categoria[categoria].append(
+                (regla, regla.metrica, OPERADORES[regla.operador])
+            )
+
+    @classmethod
+    def desde_archivo(
+        cls, ruta_reglas: Path, normalizar: Optional[Callable[[str], str]] = None
+    ) -> "MotorReglas":
+        return cls(cargar_reglas(ruta_reglas), normalizar)
+
+    def evaluar(
+        self,
+        meses: Sequence[int],
+        categorias: Sequence[str],
+        montos: Sequence[int],
+    ) -> List[Alerta]:
+        """
+        Evalúa todas las reglas sobre las columnas de movimientos:
+        1. Una pasada vectorizada agrupa por (mes, categoría)
+           (tabla_desde_columnas).
+        2. Las reglas se evalúan sobre esa tabla (evaluar_tabla).
+        Es el mismo camino que sigue P03: arma la tabla en cada parcial y
+        evalúa las reglas al finalizar.
+        """
+        return self.evaluar_tabla(tabla_desde_columnas(meses, categorias, montos))
+
+    def evaluar_tabla(self, tabla: TablaMensual) -> List[Alerta]:
+        """
+        Evalúa las reglas sobre una tabla por (mes, categoría) ya agregada
+        (por ejemplo, la de un parcial combinado). La tabla debe traer
+        todas las categorías, no solo las con reglas: el total del mes
+        (para "participacion") sale de sumarlas.
+
+        Cada regla se evalúa en TODOS los meses con movimientos: si la
+        categoría no tuvo movimientos en un mes, sus métricas valen 0 (así
+        "ahorro total < 50000" avisa justamente en el mes sin ahorro).
+        Por cada categoría con reglas se arma un arreglo por métrica (un
+        valor por mes) y cada regla es una máscara sobre ese arreglo.
+        """
+        meses = sorted({mes for mes, _ in tabla})
+        if not meses:
+            return []
+        posicion_mes = {mes: i for i, mes in enumerate(meses)}
+        con_reglas = self._por_categoria
+
+        total_mes = [0] * len(meses)
+        # categoría -> [totales, conteos, máximos] (un valor por mes)
+        celdas = {c: ([0] * len(meses), [0] * len(meses), [0] * len(meses)) for c in con_reglas}
+        for (mes, categoria), (suma, cantidad, mayor) in tabla.items():
+            i = posicion_mes[mes]
+            total_mes[i] += suma
+            celda = celdas.get(categoria)
+            if celda is not None:
+                celda[0][i] = suma
+                celda[1][i] = cantidad
+                celda[2][i] = mayor
+
+        totales_mes = np.array(total_mes, dtype=np.int64)
+        textos_mes = [f"{mes // 100:04d}-{mes % 100:02d}" for mes in meses]
+
+        # (posición del mes, categoría, orden de la regla, alerta): se
+        # ordenan al final por mes y categoría, igual que el reporte
+        encontradas: List[Tuple[int, str, int, Alerta]] = []
+        orden = 0
+        for categoria in sorted(con_reglas):
+            totales, conteos, maximos = (np.array(v, dtype=np.int64) for v in celdas[categoria])
+            valores = _metricas(totales, conteos, maximos, totales_mes)
+            for regla, metrica, comparar in con_reglas[categoria]:
+                columna = valores[metrica]
+                mascara = comparar(columna, regla.limite)
+                for i in np.flatnonzero(mascara).tolist():
+                    alerta = Alerta(regla, textos_mes[i], columna[i].item())
+                    encontradas.append((i, categoria, orden, alerta))
+                orden += 1
+
+        encontradas.sort(key=lambda e: e[:3])
+        return [alerta for *_, alerta in encontradas]
+
+    def evaluar_movimientos(self, movimientos: Sequence) -> List[Alerta]:
+        """Atajo: evalúa directamente una lista de Movimiento."""
+        return self.evaluar(*columnas_desde_movimientos(movimientos))
+
+
+def _dividir(numerador: np.ndarray, denominador: np.ndarray) -> np.ndarray:
+    """numerador / denominador en float64; donde el denominador es 0, da 0."""
+    resultado = np.zeros(len(numerador), dtype=np.float64)
+    np.divide(numerador, denominador, out=resultado, where=denominador != 0)
+    return resultado
+
+
+def _metricas(
+    totales: np.ndarray, conteos: np.ndarray, maximos: np.ndarray, totales_mes: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """Las métricas de una categoría, un valor por mes (ver METRICAS)."""
+    return {
+        "total": totales,
+        "participacion": _dividir(totales * 100.0, totales_mes),
+        "conteo": conteos,
+        "maximo": maximos,
+        "promedio": _dividir(totales, conteos),
+    }
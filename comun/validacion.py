@@ -0,0 +1,246 @@
+import csv
+import io
+from collections import Counter
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+"""
+comun/validacion.py - Validación por lotes con contadores y cuarentena
+
+Objetivo:
+- No imprimir una línea por cada fila mala (en exportaciones sucias eso
+  es más lento que el análisis mismo).
+- No abortar en el primer int() que falle.
+- Convertir columnas por lotes: se intenta convertir la columna completa
+  de un lote de una vez; solo si algo falla se revisa valor por valor.
+- Contar los errores por tipo y mandar las filas rechazadas, con su
+  motivo, a un CSV de cuarentena (un solo escritor con buffer).
+- Mostrar UN resumen al final.
+- Cortar antes si se supera un presupuesto de errores.
+
+Formato del CSV de cuarentena (4 columnas, se puede leer con
+DictReader o pandas aunque las filas vengan de archivos distintos):
+    origen,motivo,valor,fila
+donde `fila` es la fila original completa escrita como una línea CSV
+(por ejemplo: 2025-11-02,comida,abc,almuerzo).
+"""
+
+# Filas que se convierten juntas en cada lote
+TAMANO_LOTE_POR_DEFECTO = 4096
+
+# Filas rechazadas que se acumulan antes de escribir a disco
+TAMANO_BUFFER_CUARENTENA = 1024
+
+# (posición de la columna, nombre del error, función de conversión)
+Conversion = Tuple[int, str, Callable[[Any], Any]]
+
+
+def _fila_como_texto(fila: Sequence[Any]) -> str:
+    """La fila original como una sola línea CSV (None queda vacío)."""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="").writerow(fila)
+    return buffer.getvalue()
+
+
+class PresupuestoErroresExcedido(ValueError):
+    """Se rechazaron más filas de las permitidas por `max_errores`."""
+
+
+# ==============================
+# Validador
+# ==============================
+
+class Validador:
+    """
+    Lleva la cuenta de filas aceptadas/rechazadas y escribe la cuarentena.
+
+    Uso típico:
+        with Validador(Path("cuarentena.csv"), max_errores=1000) as v:
+            movimientos = leer_movimientos(ruta, validador=v)
+        print(v.resumen())
+    """
+
+    def __init__(
+        self,
+        ruta_cuarentena: Optional[Path] = None,
+        max_errores: Optional[int] = None,
+    ) -> None:
+        self.ruta_cuarentena = ruta_cuarentena
+        self.max_errores = max_errores
+
+        self.filas_ok = 0
+        self.errores: Counter = Counter()
+
+        self._archivo = None
+        self._escritor = None
+        self._pendientes: List[List[Any]] = []
+
+    @property
+    def total_errores(self) -> int:
+        return sum(self.errores.values())
+
+    def aceptar(self, cantidad: int = 1) -> None:
+        self.filas_ok += cantidad
+
+    def rechazar(self, fila: Sequence[Any], motivo: str, valor: Any, origen: str = "") -> None:
+        """Registra una fila mala. Puede lanzar PresupuestoErroresExcedido."""
+        self.errores[motivo] += 1
+
+        if self.ruta_cuarentena is not None:
+            self._pendientes.append([origen, motivo, valor, _fila_como_texto(fila)])
+            if len(self._pendientes) >= TAMANO_BUFFER_CUARENTENA:
+                self._vaciar()
+
+        if self.max_errores is not None and self.total_errores > self.max_errores:
+            self._vaciar()
+            raise PresupuestoErroresExcedido(
+                f"Se superó el máximo de {self.max_errores} filas con errores "
+                f"({self._detalle_errores()}). Se detiene la lectura."
+            )
+
+    def _vaciar(self) -> None:
+        """Escribe a disco las filas rechazadas acumuladas."""
+        if not self._pendientes or self.ruta_cuarentena is None:
+            return
+
+        if self._escritor is None:
+            self.ruta_cuarentena.parent.mkdir(parents=True, exist_ok=True)
+            self._archivo = self.ruta_cuarentena.open(
+                "w", encoding="utf-8", newline="", buffering=1 << 16
+            )
+            self._escritor = csv.writer(self._archivo)
+            self._escritor.writerow(["origen", "motivo", "valor", "fila"])
+
+        self._escritor.writerows(self._pendientes)
+        self._pendientes.clear()
+
+    def cerrar(self) -> None:
+        self._vaciar()
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+            self._escritor = None
+
+    def __enter__(self) -> "Validador":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+    def _detalle_errores(self) -> str:
+        return ", ".join(f"{motivo}: {n}" for motivo, n in self.errores.most_common())
+
+    def resumen(self) -> str:
+        """Una sola línea con el resultado de la validación."""
+        if not self.errores:
+            return f"✅ {self.filas_ok} filas válidas, sin errores."
+
+        texto = (
+            f"⚠️  {self.filas_ok} filas válidas, {self.total_errores} omitidas "
+            f"({self._detalle_errores()})"
+        )
+        if self.ruta_cuarentena is not None:
+            texto += f". Detalle en: {self.ruta_cuarentena}"
+        return texto
+
+
+@contextmanager
+def usar_validador(validador: Optional[Validador]) -> Iterator[Validador]:
+    """
+    Para los lectores: si reciben un validador lo usan tal cual (quien lo
+    creó decide cuándo cerrarlo y mostrar el resumen). Si no, crean uno
+    propio y al terminar imprimen su resumen, solo si hubo errores.
+    """
+    if validador is not None:
+        yield validador
+        return
+
+    propio = Validador()
+    try:
+        yield propio
+    finally:
+        propio.cerrar()
+
+    if propio.errores:
+        print(propio.resumen())
+
+
+# ==============================
+# Conversión por lotes
+# ==============================
+
+def convertir_columna(
+    valores: Sequence[Any], convertir: Callable[[Any], Any]
+) -> Tuple[List[Any], List[int]]:
+    """
+    Convierte una columna completa de un lote.
+
+    Camino rápido: map() sobre toda la columna (sin try por valor).
+    Cuentan como valor malo: TypeError, ValueError y OverflowError
+    (montos que no caben en 64 bits, ver comun/dinero.py).
+    Si falla, se repite valor por valor para saber cuáles son malos.
+
+    Retorna (valores convertidos, posiciones con error). En las posiciones
+    con error el valor convertido queda en None.
+    """
+    try:
+        return list(map(convertir, valores)), []
+    except (TypeError, ValueError, OverflowError):
+        pass
+
+    convertidos: List[Any] = []
+    malos: List[int] = []
+    for i, valor in enumerate(valores):
+        try:
+            convertidos.append(convertir(valor))
+        except (TypeError, ValueError, OverflowError):
+            convertidos.append(None)
+            malos.append(i)
+    return convertidos, malos
+
+
+def validar_filas(
+    filas: Iterable[List[str]],
+    conversiones: Sequence[Conversion],
+    validador: Validador,
+    origen: str = "",
+    tamano_lote: int = TAMANO_LOTE_POR_DEFECTO,
+) -> Iterator[Tuple[List[str], Tuple[Any, ...]]]:
+    """
+    Recorre filas crudas en lotes y entrega (fila, valores_convertidos)
+    solo para las filas válidas, en el mismo orden del archivo.
+
+    valores_convertidos trae un valor por cada conversión, en el orden de
+    `conversiones`. Las filas malas van al validador con el motivo del
+    primer error encontrado.
+    """
+    iterador = iter(filas)
+
+    while True:
+        lote = list(islice(iterador, tamano_lote))
+        if not lote:
+            return
+
+        columnas: List[List[Any]] = []
+        motivo_por_fila = {}
+
+        for posicion, motivo, convertir in conversiones:
+            convertidos, malos = convertir_columna([f[posicion] for f in lote], convertir)
+            columnas.append(convertidos)
+            for i in malos:
+                motivo_por_fila.setdefault(i, (motivo, lote[i][posicion]))
+
+        if not motivo_por_fila:
+            validador.aceptar(len(lote))
+            yield from zip(lote, zip(*columnas)) if columnas else ((f, ()) for f in lote)
+            continue
+
+        for i, fila in enumerate(lote):
+            error = motivo_por_fila.get(i)
+            if error is not None:
+                validador.rechazar(fila, error[0], error[1], origen)
+                continue
+            validador.aceptar()
+            yield fila, tuple(col[i] for col in columnas)
@@ -0,0 +1,23 @@
+import sys
+from pathlib import Path
+
+"""
+tests/conftest.py - Rutas para importar el paquete "comun" y los scripts
+
+Los scripts de 02_data/ y 03_projects/ no son paquetes: se agregan sus
+carpetas al sys.path igual que cuando se ejecutan directamente.
+
+Uso (desde la raíz del repo):
+    python -m pytest -q
+"""
+
+RUTA_BASE = Path(__file__).resolve().parents[1]
+
+for carpeta in (
+    RUTA_BASE,
+    RUTA_BASE / "02_data",
+    RUTA_BASE / "03_projects" / "P03_finanzas_personales",
+    RUTA_BASE / "03_projects" / "P04_redes_sociales",
+):
+    if str(carpeta) not in sys.path:
+        sys.path.insert(0, str(carpeta))
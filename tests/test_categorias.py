@@ -0,0 +1,64 @@
+from P03_ingresos_dj import leer_eventos
+from comun.categorias import NormalizadorCategorias, cargar_alias
+
+
+def test_normaliza_variantes_a_la_misma_categoria():
+    norm = NormalizadorCategorias()
+
+    assert {norm.normalizar(t) for t in ["Comida", "comida ", " COMIDA", "co  mida"]} == {
+        "comida",
+        "co mida",
+    }
+    # La canónica es siempre el mismo objeto (internada)
+    assert norm.normalizar("Comida") is norm.normalizar("COMIDA ")
+
+
+def test_alias_desde_archivo(tmp_path):
+    ruta = tmp_path / "alias.csv"
+    ruta.write_text("alias,canonica\n Almuerzo ,Comida\nlocomocion,TRANSPORTE\n", encoding="utf-8")
+
+    norm = NormalizadorCategorias.desde_archivo(ruta)
+
+    assert cargar_alias(ruta) == {"almuerzo": "comida", "locomocion": "transporte"}
+    assert norm.normalizar("ALMUERZO") == "comida"
+    assert norm.codigo("almuerzo") == norm.codigo("comida")
+    assert norm.normalizar("Locomocion") == "transporte"
+    assert norm.categorias == ["comida", "transporte"]
+
+
+def test_cache_descarta_la_entrada_mas_antigua():
+    norm = NormalizadorCategorias(tamano_cache=2)
+
+    norm.normalizar("Comida")
+    norm.normalizar("comida ")
+    norm.normalizar("Transporte")
+
+    assert list(norm._cache) == ["comida ", "Transporte"]
+
+
+def test_codigos_estables_despues_de_descartar_de_la_cache():
+    norm = NormalizadorCategorias(tamano_cache=1)
+
+    codigo_comida = norm.codigo("Comida")
+    codigo_transporte = norm.codigo("Transporte")
+    # "Comida" ya salió de la caché: se vuelve a limpiar, pero el código
+    # de la categoría canónica no cambia ni se crea una nueva
+    assert "Comida" not in norm._cache
+    assert norm.codigo("Comida") == codigo_comida
+    assert norm.codigo("TRANSPORTE") == codigo_transporte
+    assert norm.nombre(codigo_comida) == "comida"
+    assert len(norm) == 2
+
+
+def test_lugar_se_normaliza(tmp_path):
+    ruta = tmp_path / "eventos.csv"
+    ruta.write_text(
+        "fecha,lugar,tipo_evento,horas,pago_base,propina,transporte,otros_costos\n"
+        "2025-01-01,Bar Central,bar,4,1,0,0,0\n"
+        "2025-01-02, bar  central ,BAR,4,1,0,0,0\n",
+        encoding="utf-8",
+    )
+
+    eventos = leer_eventos(ruta)
+
+    assert [(e.lugar, e.tipo_evento) for e in eventos] == [("bar central", "bar")] * 2
@@ -0,0 +1,99 @@
+import csv
+import gzip
+import io
+import threading
+import time
+
+import pytest
+
+from comun.compresion import (
+    MAGIC_ZSTD,
+    LectorEnSegundoPlano,
+    abrir_texto,
+    detectar_compresion,
+)
+
+# Un campo entre comillas con \r\n adentro: csv debe recibirlo tal cual
+CSV_DEMO = (
+    "fecha,categoria,monto,detalle\r\n"
+    "2025-01-01,comida,100,almuerzo\r\n"
+    '2025-01-02,otros,200,"dos\r\nlineas"\r\n'
+)
+
+
+@pytest.fixture
+def archivos(tmp_path):
+    plano = tmp_path / "movimientos.gz"  # la extensión no importa
+    plano.write_bytes(CSV_DEMO.encode("utf-8"))
+    comprimido = tmp_path / "movimientos.csv"
+    comprimido.write_bytes(gzip.compress(CSV_DEMO.encode("utf-8")))
+    return plano, comprimido
+
+
+def test_detecta_por_magic_bytes(tmp_path, archivos):
+    plano, comprimido = archivos
+    zst = tmp_path / "datos.csv"
+    zst.write_bytes(MAGIC_ZSTD + b"\x00" * 8)
+
+    assert detectar_compresion(plano) is None
+    assert detectar_compresion(comprimido) == "gzip"
+    assert detectar_compresion(zst) == "zstd"
+
+
+def test_gzip_igual_al_csv_plano(archivos):
+    plano, comprimido = archivos
+
+    with abrir_texto(plano) as f:
+        texto_plano = f.read()
+    with abrir_texto(comprimido) as f:
+        texto_gzip = f.read()
+    with abrir_texto(comprimido) as f:
+        filas = list(csv.reader(f))
+
+    assert texto_gzip == texto_plano == CSV_DEMO
+    assert filas[2] == ["2025-01-02", "otros", "200", "dos\r\nlineas"]
+
+
+class FuenteInfinita(io.RawIOBase):
+    """Entrega bytes sin fin: el productor siempre termina con la cola llena."""
+
+    def __init__(self):
+        super().__init__()
+        self.cerrada = threading.Event()
+
+    def readable(self):
+        return True
+
+    def read(self, n=-1):
+        return b"x" * max(n, 1)
+
+    def close(self):
+        self.cerrada.set()
+        super().close()
+
+
+def test_cerrar_antes_de_tiempo_con_productor_bloqueado():
+    fuente = FuenteInfinita()
+    lector = LectorEnSegundoPlano(fuente, tamano_bloque=16, max_bloques=2)
+
+    assert lector.read(4) == b"xxxx"
+    # Esperamos a que el productor llene la cola y quede bloqueado
+    limite = time.monotonic() + 5
+    while not lector._cola.full() and time.monotonic() < limite:
+        time.sleep(0.01)
+    assert lector._cola.full()
+
+    lector.close()
+
+    assert not lector._hilo.is_alive()
+    assert fuente.cerrada.is_set()
+
+
+def test_gzip_truncado_lanza_eoferror_al_leer(tmp_path):
+    datos = gzip.compress(("2025-01-01,comida,100,x\n" * 10_000).encode("utf-8"))
+    truncado = tmp_path / "truncado.csv.gz"
+    truncado.write_bytes(datos[: len(datos) // 2])
+
+    with abrir_texto(truncado) as f:
+        with pytest.raises(EOFError):
+            f.read()
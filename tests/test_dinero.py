@@ -0,0 +1,107 @@
+import random
+from datetime import datetime
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from comun.dinero import (
+    MAX_INT64,
+    ColumnaDinero,
+    a_decimal,
+    agregar_por_grupo,
+    parsear_monto,
+    suma_exacta,
+    sumar_tramos,
+)
+from comun.reglas_presupuesto import columnas_desde_movimientos
+
+
+def montos_con_centavos(cantidad: int):
+    rnd = random.Random(42)
+    return [f"{rnd.randint(0, 99_999)}.{rnd.randint(0, 99):02d}" for _ in range(cantidad)]
+
+
+def test_suma_exacta_sin_deriva_contra_decimal():
+    textos = montos_con_centavos(100_000)
+
+    suma_decimal = sum(Decimal(t) for t in textos)
+    suma_entera = suma_exacta(parsear_monto(t, 2) for t in textos)
+
+    assert a_decimal(suma_entera, 2) == suma_decimal
+    # El float sí acumula error con estos mismos montos
+    assert Decimal(sum(float(t) for t in textos)) != suma_decimal
+
+
+def test_columna_dinero_sin_deriva_contra_decimal():
+    textos = montos_con_centavos(100_000)
+    columna = ColumnaDinero.desde_textos(textos, decimales=2)
+
+    assert columna.valores.dtype == np.int64
+    assert a_decimal(columna.suma(), 2) == sum(Decimal(t) for t in textos)
+
+
+def test_sumas_vectorizadas_controlan_desborde():
+    columna = ColumnaDinero([MAX_INT64, 10, -20])
+    # El total cabe en int64 aunque una suma parcial no: se suma exacto
+    assert columna.suma() == MAX_INT64 - 10
+    with pytest.raises(OverflowError):
+        ColumnaDinero([MAX_INT64, 1]).suma()
+    with pytest.raises(OverflowError):
+        ColumnaDinero([MAX_INT64 + 1])
+
+    valores = np.array([MAX_INT64, -5, 3, 4], dtype=np.int64)
+    assert sumar_tramos(valores, np.array([0, 2])).tolist() == [MAX_INT64 - 5, 7]
+    with pytest.raises(OverflowError):
+        sumar_tramos(np.array([MAX_INT64, 1, 2], dtype=np.int64), np.array([0, 2]))
+
+
+def test_agregar_por_grupo_igual_que_con_enteros_de_python():
+    rnd = random.Random(3)
+    claves = [rnd.randint(0, 20) for _ in range(5_000)]
+    valores = [rnd.randint(-80_000, 80_000) for _ in range(5_000)]
+
+    grupos, totales, conteos, maximos = agregar_por_grupo(
+        np.array(claves), np.array(valores, dtype=np.int64)
+    )
+
+    esperado = {}
+    for clave, valor in zip(claves, valores):
+        total, conteo, maximo = esperado.get(clave, (0, 0, valor))
+        esperado[clave] = (total + valor, conteo + 1, max(maximo, valor))
+    assert grupos.tolist() == sorted(esperado)
+    assert list(zip(totales.tolist(), conteos.tolist(), maximos.tolist())) == [
+        esperado[g] for g in sorted(esperado)
+    ]
+
+
+def test_columna_sumar_por_grupo_y_maximo():
+    columna = ColumnaDinero([500, 8_000, 300, 8_000])
+
+    assert columna.sumar_por_grupo(np.array([0, 2, 0, 2]), 3) == [800, 0, 16_000]
+    assert columna.maximo() == 8_000
+    assert columna.posicion_maximo() == 1
+
+
+def test_parsear_monto_rechaza_decimales_de_mas_y_desborde():
+    # Regla estricta: CLP no tiene decimales y no se redondea
+    with pytest.raises(ValueError):
+        parsear_monto("8500.5")
+    assert parsear_monto("8500.0") == 8500
+    with pytest.raises(OverflowError):
+        parsear_monto("99999999999999999999999")
+
+
+def test_columnas_desde_movimientos_usa_columna_dinero():
+    class Mov:
+        def __init__(self, fecha, categoria, monto):
+            self.fecha, self.categoria, self.monto = fecha, categoria, monto
+
+    meses, categorias, montos = columnas_desde_movimientos(
+        [Mov(datetime(2025, 11, 1), "comida", 8500), Mov(datetime(2025, 12, 2), "otros", 1)]
+    )
+
+    assert meses.tolist() == [202511, 202512]
+    assert categorias == ["comida", "otros"]
+    assert isinstance(montos, ColumnaDinero)
+    assert montos.suma() == 8501
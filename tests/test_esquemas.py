@@ -0,0 +1,68 @@
+import io
+
+from P03_ingresos_dj import leer_eventos
+from comun.esquemas import MOVIMIENTOS, leer_registros
+from comun.validacion import Validador
+
+CSV_EVENTOS = (
+    "fecha,lugar,tipo_evento,horas,pago_base,propina,transporte,otros_costos\n"
+    "2025-01-01,Bar\n"
+    "2025-01-02,Club,Matrimonio,5,100000,0,0,0\n"
+)
+
+
+def test_fila_corta_se_rechaza_con_columna_de_categoria(tmp_path):
+    ruta = tmp_path / "eventos.csv"
+    ruta.write_text(CSV_EVENTOS, encoding="utf-8")
+
+    with Validador() as validador:
+        eventos = leer_eventos(ruta, columnas=["tipo_evento"], validador=validador)
+
+    assert [e.tipo_evento for e in eventos] == ["matrimonio"]
+    assert validador.errores == {"fila_incompleta": 1}
+
+
+def test_fila_corta_se_rechaza_igual_con_todas_las_columnas(tmp_path):
+    # Que una fila se acepte o no, no depende de qué columnas se pidan
+    ruta = tmp_path / "eventos.csv"
+    ruta.write_text(CSV_EVENTOS, encoding="utf-8")
+
+    with Validador() as validador:
+        eventos = leer_eventos(ruta, validador=validador)
+
+    assert [e.tipo_evento for e in eventos] == ["matrimonio"]
+    assert validador.errores == {"fila_incompleta": 1}
+
+
+def test_fila_corta_que_trae_las_columnas_pedidas_se_acepta(tmp_path):
+    ruta = tmp_path / "eventos.csv"
+    ruta.write_text(CSV_EVENTOS, encoding="utf-8")
+
+    with Validador() as validador:
+        eventos = leer_eventos(ruta, columnas=["lugar"], validador=validador)
+
+    assert [e.lugar for e in eventos] == ["bar", "club"]
+    assert not validador.errores
+
+
+def test_fila_corta_con_filtro_de_fecha(tmp_path):
+    texto = "fecha,categoria,monto,detalle\n2025-01-01\n2025-01-02,Comida,100,x\n"
+    ruta = tmp_path / "cuarentena.csv"
+    with Validador(ruta) as validador:
+        registros = list(
+            leer_registros(
+                io.StringIO(texto),
+                MOVIMIENTOS,
+                validador,
+                origen="movimientos.csv",
+                columnas=["fecha", "categoria"],
+                normalizar=str.lower,
+                fecha_desde="2025-01-01",
+            )
+        )
+
+    assert [r.categoria for r in registros] == ["comida"]
+    assert validador.errores == {"fila_incompleta": 1}
+    assert ruta.read_text(encoding="utf-8").splitlines()[1] == (
+        "movimientos.csv,fila_incompleta,1,\"2025-01-01,,,\""
+    )
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from P04_analizador_redes import cargar_datos
+from comun import expresiones
+from comun.expresiones import ExpresionInvalida, ExpresionMetrica
+
+COLUMNAS = {
+    "likes": np.array([10, 0, 7, 3], dtype=np.int64),
+    "comentarios": np.array([2, 0, 1, 5], dtype=np.int64),
+    "guardados": np.array([1, 0, 0, 4], dtype=np.int64),
+    "reproducciones": np.array([100, 0, 50, 0], dtype=np.int64),
+}
+
+EXPRESIONES = [
+    "likes + comentarios + guardados",
+    "(likes + 2*comentarios + 3*guardados) / reproducciones",
+    "-likes + 1.5 * (comentarios - guardados)",
+    "likes / (comentarios - guardados) / reproducciones",
+]
+
+
+def evaluar_con_numpy(texto, columnas):
+    """Fuerza el camino numpy aunque numexpr esté instalado."""
+    metrica = ExpresionMetrica(texto)
+    metrica._texto_numexpr = None
+    return metrica.evaluar(columnas)
+
+
+def test_division_por_cero_da_cero():
+    resultado = evaluar_con_numpy("likes / reproducciones", COLUMNAS)
+
+    assert resultado.tolist() == [0.1, 0.0, 0.14, 0.0]
+    assert evaluar_con_numpy("likes / 0", COLUMNAS).tolist() == [0.0] * 4
+
+
+def test_sin_division_el_resultado_es_entero():
+    resultado = ExpresionMetrica("likes + 2*comentarios").evaluar(COLUMNAS)
+
+    assert resultado.dtype.kind == "i"
+    assert resultado.tolist() == [14, 0, 9, 13]
+
+
+@pytest.mark.parametrize(
+    "texto",
+    ["abs(likes)", "likes.real", "likes ** 2", "likes // 2", "likes > 0", "'a'", "likes +"],
+)
+def test_sintaxis_rechazada(texto):
+    with pytest.raises(ExpresionInvalida):
+        ExpresionMetrica(texto)
+
+
+def test_expresion_sin_columnas_se_rechaza():
+    with pytest.raises(ExpresionInvalida):
+        ExpresionMetrica("3")
+
+
+def test_columna_faltante():
+    with pytest.raises(KeyError):
+        ExpresionMetrica("likes + vistas").evaluar(COLUMNAS)
+
+
+@pytest.mark.parametrize("texto", EXPRESIONES)
+def test_numexpr_y_numpy_coinciden(texto):
+    if expresiones.numexpr is None:
+        pytest.skip("numexpr no está instalado")
+
+    con_numexpr = ExpresionMetrica(texto).evaluar(COLUMNAS)
+    con_numpy = evaluar_con_numpy(texto, COLUMNAS)
+
+    assert con_numexpr.dtype.kind == con_numpy.dtype.kind
+    np.testing.assert_allclose(con_numexpr, con_numpy)
+
+
+def test_cargar_datos_con_metrica_propia(tmp_path):
+    ruta = tmp_path / "posts.csv"
+    pd.DataFrame(
+        {
+            "fecha": ["2025-01-01", "2025-01-02"],
+            "red": ["Instagram", "tiktok"],
+            "tipo": ["reel", "post"],
+            "descripcion": ["a", "b"],
+            "likes": [10, 4],
+            "comentarios": [1, 0],
+            "guardados": [0, 2],
+            "reproducciones": [20, 0],
+        }
+    ).to_csv(ruta, index=False)
+
+    df = cargar_datos(ruta, metricas={"likes_por_vista": "likes / reproducciones"})
+
+    assert df["likes_por_vista"].tolist() == [0.5, 0.0]
+    assert df["red"].tolist() == ["instagram", "tiktok"]
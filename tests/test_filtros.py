@@ -0,0 +1,83 @@
+import io
+from pathlib import Path
+
+from analizador_finanzas import leer_movimientos
+from comun.filtros import prefiltrar_lineas
+from comun.validacion import Validador
+
+ENCABEZADO = ["fecha", "categoria", "monto", "detalle"]
+
+# El primer registro (fuera de rango) tiene un detalle de 3 líneas cuyas
+# continuaciones empiezan con algo con forma de fecha
+CSV_MULTILINEA = (
+    "fecha,categoria,monto,detalle\n"
+    '2024-01-01,comida,100,"a\n'
+    '""x"",b\n'
+    "2025-11-01,comida,200,ok\n"
+    '2025-11-02,comida,300,bien"\n'
+    "2025-11-03,comida,400,real\n"
+)
+
+
+def test_prefiltro_descarta_continuaciones_de_registro_descartado():
+    lineas = io.StringIO(CSV_MULTILINEA)
+    lineas.readline()
+    conservadas = list(prefiltrar_lineas(lineas, ENCABEZADO, fecha_desde="2025-01-01"))
+    assert conservadas == ["2025-11-03,comida,400,real\n"]
+
+
+def test_prefiltro_conserva_continuaciones_de_registro_conservado():
+    texto = (
+        '2025-11-01,comida,100,"linea uno\n'
+        '2024-01-01 parece fecha"\n'
+        "2024-02-01,comida,5,viejo\n"
+    )
+    conservadas = list(
+        prefiltrar_lineas(io.StringIO(texto), ENCABEZADO, fecha_desde="2025-01-01")
+    )
+    assert conservadas == texto.splitlines(keepends=True)[:2]
+
+
+def test_leer_movimientos_no_inventa_filas(tmp_path: Path):
+    ruta = tmp_path / "gastos.csv"
+    ruta.write_text(CSV_MULTILINEA, encoding="utf-8")
+
+    with Validador() as validador:
+        movimientos = leer_movimientos(ruta, fecha_desde="2025-01-01", validador=validador)
+
+    assert [(m.monto, m.detalle) for m in movimientos] == [(400, "real")]
+    assert not validador.errores
+
+
+def test_prefiltro_comilla_en_medio_de_campo_no_abre_comillas():
+    # Para csv la comilla de 5" es un carácter más (no abre un campo), así
+    # que las filas siguientes son registros propios y no continuaciones
+    texto = (
+        '2024-12-31,otros,100,pantalla 5" pulgadas\n'
+        "2025-01-02,otros,200,ok\n"
+        '2025-01-03,otros,300,"con ""comillas"", bien"\n'
+        "2025-01-04,otros,400,fin\n"
+    )
+    conservadas = list(
+        prefiltrar_lineas(io.StringIO(texto), ENCABEZADO, fecha_desde="2025-01-01")
+    )
+    assert conservadas == texto.splitlines(keepends=True)[1:]
+
+
+def test_leer_movimientos_con_comilla_en_medio_de_campo(tmp_path: Path):
+    ruta = tmp_path / "gastos.csv"
+    ruta.write_text(
+        "fecha,categoria,monto,detalle\n"
+        '2024-12-31,otros,100,pantalla 5" pulgadas\n'
+        "2025-01-02,otros,200,ok\n"
+        "2025-01-03,otros,300,ok\n",
+        encoding="utf-8",
+    )
+
+    with Validador() as validador:
+        todos = leer_movimientos(ruta, validador=validador)
+        filtrados = leer_movimientos(ruta, fecha_desde="2025-01-01", validador=validador)
+
+    assert [m.monto for m in todos] == [100, 200, 300]
+    assert [m.monto for m in filtrados] == [200, 300]
+    assert not validador.errores
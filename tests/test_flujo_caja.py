@@ -0,0 +1,170 @@
+import random
+from datetime import date
+
+import pytest
+
+from comun.flujo_caja import (
+    FlujoMensual,
+    Fuente,
+    MovimientoCaja,
+    calcular_flujo_caja,
+    flujo_diario,
+    generar_texto_reporte,
+    iterar_eventos,
+    iterar_gastos,
+    mezclar_fuentes,
+    ordenar_externo,
+)
+from comun.validacion import Validador
+
+
+def mov(dia, monto, origen, mes=11):
+    return MovimientoCaja(date(2025, mes, dia), monto, origen)
+
+
+def test_tasa_ahorro_sin_ingresos_no_es_cero():
+    assert FlujoMensual("2025-11", ingresos=0, gastos=60_500).tasa_ahorro is None
+    assert FlujoMensual("2025-11", ingresos=100, gastos=25).tasa_ahorro == 75.0
+
+
+def test_reporte_muestra_na_sin_ingresos():
+    fuentes = [Fuente("gastos", [MovimientoCaja(date(2025, 11, 1), -500, "gastos")])]
+    texto = generar_texto_reporte(calcular_flujo_caja(fuentes))
+    assert "ahorro     n/a" in texto
+
+
+def test_filas_invalidas_se_cuentan(tmp_path):
+    ruta = tmp_path / "gastos.csv"
+    ruta.write_text(
+        "fecha,categoria,monto,detalle\n"
+        "2025-11-01,comida,8500,almuerzo\n"
+        "no-es-fecha,comida,100,x\n"
+        "2025-11-02,comida,abc,y\n",
+        encoding="utf-8",
+    )
+
+    with Validador() as validador:
+        movimientos = list(iterar_gastos(ruta, validador=validador))
+
+    assert movimientos == [MovimientoCaja(date(2025, 11, 1), -8500, "gastos")]
+    assert validador.filas_ok == 1
+    assert validador.errores == {"fecha_invalida": 1, "monto_invalido": 1}
+
+
+def test_ordenar_externo_usa_varios_bloques_en_disco(tmp_path):
+    movimientos = [mov(1 + i % 28, -(i + 1), "gastos") for i in range(20)]
+    random.Random(7).shuffle(movimientos)
+
+    ordenados = ordenar_externo(movimientos, tamano_bloque=3, carpeta_temporal=tmp_path)
+    primero = next(ordenados)
+    # Mientras se recorre, los bloques ordenados están en disco
+    (carpeta,) = tmp_path.iterdir()
+    assert len(list(carpeta.glob("bloque_*.csv"))) == 7
+
+    resultado = [primero, *ordenados]
+    assert [m.fecha for m in resultado] == sorted(m.fecha for m in movimientos)
+    assert sorted(resultado) == sorted(movimientos)
+    # Al terminar se borran los bloques temporales
+    assert not list(tmp_path.iterdir())
+
+
+def test_ordenar_externo_un_solo_bloque_no_toca_disco(tmp_path):
+    movimientos = [mov(3, -1, "a"), mov(1, -2, "a")]
+
+    assert list(ordenar_externo(movimientos, tamano_bloque=5, carpeta_temporal=tmp_path)) == [
+        mov(1, -2, "a"),
+        mov(3, -1, "a"),
+    ]
+    assert not list(tmp_path.iterdir())
+
+
+def test_fuente_marcada_ordenada_que_no_lo_esta():
+    fuentes = [Fuente("gastos", [mov(2, -100, "gastos"), mov(1, -50, "gastos")])]
+
+    with pytest.raises(ValueError, match="'gastos' no está ordenada"):
+        list(mezclar_fuentes(fuentes))
+
+
+def test_merge_k_way_saldo_y_totales_mensuales():
+    gastos = [mov(1, -1_000, "gastos"), mov(3, -500, "gastos"), mov(2, -300, "gastos", mes=12)]
+    ingresos = [mov(1, 5_000, "dj"), mov(20, 2_000, "dj"), mov(5, 4_000, "dj", mes=12)]
+    # Desordenada: pasa por el ordenamiento externo con bloques de 2 filas
+    extra = [mov(9, -700, "extra", mes=12), mov(3, 100, "extra"), mov(1, -250, "extra", mes=12)]
+
+    resumen = calcular_flujo_caja(
+        [
+            Fuente("gastos", gastos),
+            Fuente("dj", ingresos),
+            Fuente("extra", extra, ordenada=False),
+        ],
+        saldo_inicial=10_000,
+        tamano_bloque=2,
+    )
+
+    assert [(d.fecha.day, d.ingresos, d.gastos, d.saldo) for d in resumen.dias] == [
+        (1, 5_000, 1_000, 14_000),
+        (3, 100, 500, 13_600),
+        (20, 2_000, 0, 15_600),
+        (1, 0, 250, 15_350),
+        (2, 0, 300, 15_050),
+        (5, 4_000, 0, 19_050),
+        (9, 0, 700, 18_350),
+    ]
+    assert resumen.saldo_final == 18_350
+    assert {mes: (m.ingresos, m.gastos) for mes, m in resumen.meses.items()} == {
+        "2025-11": (7_100, 1_500),
+        "2025-12": (4_000, 1_250),
+    }
+
+
+def test_flujo_desde_csv_gastos_y_eventos(tmp_path):
+    ruta_gastos = tmp_path / "gastos.csv"
+    ruta_gastos.write_text(
+        "fecha,categoria,monto,detalle\n"
+        "2025-11-01,comida,8500,almuerzo\n"
+        "2025-11-15,transporte,1500,metro\n",
+        encoding="utf-8",
+    )
+    ruta_eventos = tmp_path / "eventos.csv"
+    ruta_eventos.write_text(
+        "fecha,lugar,tipo_evento,horas,pago_base,propina,transporte,otros_costos\n"
+        "2025-11-10,Bar,bar,4,60000,5000,3000,0\n",
+        encoding="utf-8",
+    )
+
+    with Validador() as validador:
+        resumen = calcular_flujo_caja(
+            [
+                Fuente("gastos", iterar_gastos(ruta_gastos, validador=validador)),
+                Fuente("eventos_dj", iterar_eventos(ruta_eventos, validador=validador)),
+            ],
+            guardar_dias=False,
+        )
+
+    assert resumen.dias == []
+    assert resumen.saldo_final == 62_000 - 10_000
+    assert resumen.meses["2025-11"].tasa_ahorro == pytest.approx(100 * 52_000 / 62_000)
+    assert validador.filas_ok == 3
+
+
+def test_flujo_diario_por_lotes_igual_que_fila_a_fila():
+    rnd = random.Random(11)
+    movimientos = sorted(
+        mov(rnd.randint(1, 30), rnd.randint(-50_000, 50_000), "x") for _ in range(500)
+    )
+
+    esperado = {}
+    for m in movimientos:
+        ingresos, gastos = esperado.get(m.fecha, (0, 0))
+        if m.monto >= 0:
+            esperado[m.fecha] = (ingresos + m.monto, gastos)
+        else:
+            esperado[m.fecha] = (ingresos, gastos - m.monto)
+
+    # Lotes de 7: la mayoría de los días quedan repartidos entre dos lotes
+    dias = list(flujo_diario(movimientos, saldo_inicial=1_000, tamano_lote=7))
+
+    assert [(d.fecha, d.ingresos, d.gastos) for d in dias] == [
+        (fecha, *totales) for fecha, totales in esperado.items()
+    ]
+    assert dias[-1].saldo == 1_000 + sum(m.monto for m in movimientos)
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+import pandas as pd
+
+from analizador_finanzas import Movimiento, calcular_resumen, leer_movimientos
+from P04_analizador_redes import temas_recurrentes
+from comun.validacion import Validador
+
+
+def test_reembolso_negativo_no_rompe_el_resumen(tmp_path):
+    ruta = tmp_path / "gastos.csv"
+    ruta.write_text(
+        "fecha,categoria,monto,detalle\n"
+        "2025-11-01,comida,8500,almuerzo\n"
+        "2025-11-02,reembolso,-3000,devolucion\n",
+        encoding="utf-8",
+    )
+
+    with Validador() as validador:
+        movimientos = leer_movimientos(ruta, validador=validador)
+    resumen = calcular_resumen(movimientos)
+
+    # El reembolso cuenta en los totales (igual que antes del sketch)...
+    assert resumen.total_general == 5500
+    assert resumen.gasto_por_categoria["reembolso"] == -3000
+    # ...y en el conteo de detalles, pero no en el top de gasto
+    assert {f.clave for f in resumen.detalles_frecuentes} == {"almuerzo", "devolucion"}
+    assert [(f.clave, f.estimado) for f in resumen.detalles_mayor_gasto] == [("almuerzo", 8500)]
+
+
+def test_solo_reembolsos():
+    resumen = calcular_resumen([Movimiento(datetime(2025, 11, 2), "reembolso", -3000, "dev")])
+    assert resumen.detalles_mayor_gasto == []
+
+
+def test_temas_recurrentes_ignora_metricas_negativas():
+    df = pd.DataFrame(
+        {"descripcion": ["Set  en Club", "set en club", "mal post"], "neto": [10, 5, -4]}
+    )
+
+    temas = temas_recurrentes(df, metrica="neto")
+
+    assert [(t.clave, t.estimado) for t in temas] == [("set en club", 15)]
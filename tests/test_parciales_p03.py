@@ -0,0 +1,60 @@
+from datetime import datetime
+
+from analizador_finanzas import (
+    Movimiento,
+    calcular_parcial,
+    calcular_resumen,
+    cargar_parcial_resumen,
+    combinar_parciales,
+    finalizar_resumen,
+    generar_texto_reporte,
+    guardar_parcial_resumen,
+)
+from comun.reglas_presupuesto import MotorReglas, Regla
+
+MOVIMIENTOS = [
+    Movimiento(datetime(2025, 10, 5), "comida", 90_000, "super"),
+    Movimiento(datetime(2025, 10, 9), "transporte", 40_000, "bencina"),
+    Movimiento(datetime(2025, 11, 1), "comida", 80_000, "super"),
+    Movimiento(datetime(2025, 11, 2), "servicios", 30_000, "cuenta luz"),
+    Movimiento(datetime(2025, 11, 3), "comida", 75_000, "feria"),
+    Movimiento(datetime(2025, 11, 4), "entretenimiento", 25_000, "salida"),
+]
+
+REGLAS = [
+    Regla("Comida sobre presupuesto", "comida", "total", ">", 150_000),
+    Regla("Mucho transporte", "transporte", "participacion", ">", 10),
+    Regla("Salidas muy caras", "entretenimiento", "maximo", ">=", 20_000),
+    Regla("Sin servicios", "servicios", "conteo", "<", 1),
+]
+
+
+def test_map_merge_finalize_igual_a_una_maquina(tmp_path):
+    motor = MotorReglas(REGLAS)
+    una_maquina = generar_texto_reporte(calcular_resumen(MOVIMIENTOS, motor))
+
+    rutas = []
+    for i, shard in enumerate([MOVIMIENTOS[:3], MOVIMIENTOS[3:]]):
+        ruta = tmp_path / f"shard_{i}.parcial"
+        guardar_parcial_resumen(calcular_parcial(shard), ruta)
+        rutas.append(ruta)
+
+    combinado = combinar_parciales(cargar_parcial_resumen(r) for r in rutas)
+    varias_maquinas = generar_texto_reporte(finalizar_resumen(combinado, motor))
+
+    assert "Alertas de presupuesto:" in varias_maquinas
+    assert varias_maquinas == una_maquina
+
+
+def test_alertas_del_parcial_combinado():
+    motor = MotorReglas(REGLAS)
+    combinado = combinar_parciales(calcular_parcial([m]) for m in MOVIMIENTOS)
+
+    alertas = [(a.regla.nombre, a.mes) for a in finalizar_resumen(combinado, motor).alertas]
+
+    assert alertas == [
+        ("Sin servicios", "2025-10"),
+        ("Mucho transporte", "2025-10"),
+        ("Comida sobre presupuesto", "2025-11"),
+        ("Salidas muy caras", "2025-11"),
+    ]
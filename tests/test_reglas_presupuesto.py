@@ -0,0 +1,83 @@
+from array import array
+
+import random
+
+from comun.reglas_presupuesto import MotorReglas, Regla, tabla_desde_columnas
+
+
+def evaluar(reglas, filas):
+    meses = array("q", (m for m, _, _ in filas))
+    categorias = [c for _, c, _ in filas]
+    montos = array("q", (x for _, _, x in filas))
+    return MotorReglas(reglas).evaluar(meses, categorias, montos)
+
+
+def test_reglas_menor_que_avisan_en_meses_sin_la_categoria():
+    reglas = [
+        Regla("Poco ahorro", "ahorro", "total", "<", 50_000),
+        Regla("Pocas comidas", "comida", "conteo", "<", 2),
+    ]
+    filas = [
+        (202501, "ahorro", 80_000),
+        (202501, "comida", 5_000),
+        (202501, "comida", 7_000),
+        (202502, "transporte", 1_000),
+    ]
+
+    alertas = [(a.regla.nombre, a.mes, a.valor) for a in evaluar(reglas, filas)]
+
+    assert alertas == [
+        ("Poco ahorro", "2025-02", 0),
+        ("Pocas comidas", "2025-02", 0),
+    ]
+
+
+def test_reglas_mayor_que_no_avisan_sin_movimientos():
+    reglas = [Regla("Comida alta", "comida", "total", ">", 10_000)]
+    filas = [(202501, "comida", 12_000), (202502, "transporte", 1_000)]
+
+    alertas = [(a.mes, a.valor) for a in evaluar(reglas, filas)]
+
+    assert alertas == [("2025-01", 12_000)]
+
+
+def test_tabla_desde_columnas_igual_que_fila_a_fila():
+    rnd = random.Random(3)
+    filas = [
+        (rnd.choice([202411, 202412, 202501]), rnd.choice("abcd"), rnd.randint(-5_000, 90_000))
+        for _ in range(300)
+    ]
+
+    esperado = {}
+    for mes, categoria, monto in filas:
+        suma, cantidad, mayor = esperado.get((mes, categoria), (0, 0, monto))
+        esperado[(mes, categoria)] = [suma + monto, cantidad + 1, max(mayor, monto)]
+
+    columnas = [[fila[i] for fila in filas] for i in range(3)]
+    assert tabla_desde_columnas(*columnas) == esperado
+
+
+def test_metricas_en_orden_de_mes_categoria_y_regla():
+    reglas = [
+        Regla("Transporte caro", "transporte", "promedio", ">=", 1_000),
+        Regla("Mucha comida", "comida", "participacion", ">", 50),
+        Regla("Comida frecuente", "comida", "conteo", ">=", 2),
+        Regla("Sin transporte", "transporte", "promedio", "<", 1),
+    ]
+    filas = [
+        (202502, "comida", 3_000),
+        (202501, "transporte", 2_000),
+        (202501, "comida", 1_000),
+        (202501, "comida", 3_000),
+    ]
+
+    alertas = [(a.mes, a.regla.nombre, a.valor) for a in evaluar(reglas, filas)]
+
+    # Sin movimientos de transporte en 2025-02 el promedio vale 0, sin dividir por 0
+    assert alertas == [
+        ("2025-01", "Mucha comida", 200 / 3),
+        ("2025-01", "Comida frecuente", 2),
+        ("2025-01", "Transporte caro", 2_000.0),
+        ("2025-02", "Mucha comida", 100.0),
+        ("2025-02", "Sin transporte", 0.0),
+    ]
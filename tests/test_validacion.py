@@ -0,0 +1,57 @@
+import csv
+import sys
+
+import pytest
+
+import analizador_finanzas
+from comun.validacion import Validador, validar_filas
+
+
+def test_cuarentena_tiene_cuatro_columnas_y_conserva_la_fila(tmp_path):
+    ruta = tmp_path / "cuarentena.csv"
+    filas = [
+        ["2025-11-01", "comida", "8500", "almuerzo"],
+        ["2025-11-02", "comida", "abc", 'detalle, con "comillas"'],
+        ["2025-11-03", "transporte", None, None],
+    ]
+
+    with Validador(ruta) as validador:
+        validas = list(validar_filas(filas, [(2, "monto_invalido", int)], validador, "demo.csv"))
+
+    assert [valores for _, valores in validas] == [(8500,)]
+
+    with ruta.open(encoding="utf-8", newline="") as f:
+        rechazadas = list(csv.DictReader(f))
+
+    assert [sorted(r) for r in rechazadas] == [["fila", "motivo", "origen", "valor"]] * 2
+    assert next(csv.reader([rechazadas[0]["fila"]])) == filas[1]
+    assert rechazadas[1]["fila"] == "2025-11-03,transporte,,"
+    assert {r["motivo"] for r in rechazadas} == {"monto_invalido"}
+
+
+def test_map_con_demasiados_errores_muestra_resumen_y_sale_con_error(
+    tmp_path, monkeypatch, capsys
+):
+    ruta_csv = tmp_path / "shard.csv"
+    ruta_csv.write_text(
+        "fecha,categoria,monto,detalle\n"
+        "2025-11-01,comida,8500,ok\n"
+        "2025-11-02,comida,abc,malo\n"
+        "2025-11-03,comida,xyz,malo\n",
+        encoding="utf-8",
+    )
+    salida = tmp_path / "shard.parcial"
+    monkeypatch.setattr(analizador_finanzas, "MAX_ERRORES", 1)
+    monkeypatch.setattr(sys, "argv", ["analizador_finanzas.py", "map", str(ruta_csv), str(salida)])
+
+    with pytest.raises(SystemExit) as salida_programa:
+        analizador_finanzas.main()
+
+    assert salida_programa.value.code == 1
+    consola = capsys.readouterr().out
+    assert "Se superó el máximo de 1 filas con errores" in consola
+    assert "monto_invalido: 2" in consola
+    cuarentena = tmp_path / "shard.cuarentena.csv"
+    assert f"Detalle en: {cuarentena}" in consola
+    assert len(cuarentena.read_text(encoding="utf-8").splitlines()) == 3
+    assert not salida.exists()